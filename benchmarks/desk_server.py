@@ -0,0 +1,353 @@
+"""A local stand-in for the Desk API serving synthetic data.
+
+Articles, topics and translations are generated on request from their
+ids, so the server starts instantly at any scale. Run it on its own to
+try the client against it::
+
+  $ python benchmarks/desk_server.py --articles 100000 --latency 0.02
+
+and point a session at it with ``DeskApi2(sitename='benchmark',
+base_url='http://127.0.0.1:8000')``.
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qsl, urlencode, urlsplit
+except ImportError:  # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urllib import urlencode
+    from urlparse import parse_qsl, urlsplit
+
+
+LOCALES = ('en', 'es', 'fr', 'de', 'ja', 'pt', 'it', 'nl')
+
+TIMESTAMP = '2013-08-21T00:20:04Z'
+
+CHANNELS = (
+    'email', 'chat', 'twitter', 'qna', 'phone', 'facebook', 'web_callback',
+)
+
+
+class SyntheticDesk(object):
+    """Generate Desk API responses for a site of the given size."""
+
+    def __init__(self, articles=10000, topics=100, locales=2, per_page=50,
+                 max_per_page=1000, body_size=2000):
+
+        self.num_articles = articles
+        self.num_topics = topics
+        self.locales = LOCALES[:locales]
+        self.per_page = per_page
+        self.max_per_page = max_per_page
+        self.body_size = body_size
+
+    def _body(self, id):
+
+        paragraph = '<p>Paragraph of article %d. </p>' % (id,)
+
+        return (paragraph * (self.body_size // len(paragraph) + 1))[:self.body_size]
+
+    def topic(self, id):
+
+        return {
+            'name': 'Topic %d' % (id,),
+            'description': 'Articles about %d' % (id,),
+            'position': id,
+            'allow_questions': True,
+            'in_support_center': True,
+            'created_at': TIMESTAMP,
+            'updated_at': TIMESTAMP,
+            '_links': {
+                'self': {'href': '/api/v2/topics/%d' % (id,), 'class': 'topic'},
+                'articles': {
+                    'href': '/api/v2/topics/%d/articles' % (id,),
+                    'class': 'article',
+                },
+                'translations': {
+                    'href': '/api/v2/topics/%d/translations' % (id,),
+                    'class': 'topic_translation',
+                },
+            },
+        }
+
+    def article(self, id):
+
+        body = self._body(id)
+        entry = {
+            'subject': 'Subject %d' % (id,),
+            'body': body,
+            'position': id,
+            'quickcode': 'ARTICLE%d' % (id,),
+            'in_support_center': True,
+            'internal_notes': 'Notes on %d' % (id,),
+            'publish_at': TIMESTAMP,
+            'created_at': TIMESTAMP,
+            'updated_at': TIMESTAMP,
+            '_links': {
+                'self': {
+                    'href': '/api/v2/articles/%d' % (id,),
+                    'class': 'article',
+                },
+                'topic': {
+                    'href': '/api/v2/topics/%d' % (self.topic_id(id),),
+                    'class': 'topic',
+                },
+                'translations': {
+                    'href': '/api/v2/articles/%d/translations' % (id,),
+                    'class': 'article_translation',
+                },
+            },
+        }
+        for channel in CHANNELS:
+            entry['body_%s' % (channel,)] = body
+            entry['body_%s_auto' % (channel,)] = channel != 'email'
+
+        return entry
+
+    def translation(self, article_id, locale):
+
+        return {
+            'locale': locale,
+            'subject': 'Subject %d (%s)' % (article_id, locale),
+            'body': self._body(article_id),
+            'publish_at': TIMESTAMP,
+            'created_at': TIMESTAMP,
+            'updated_at': TIMESTAMP,
+            '_links': {
+                'self': {
+                    'href': '/api/v2/articles/%d/translations/%s' % (
+                        article_id, locale),
+                    'class': 'article_translation',
+                },
+                'article': {
+                    'href': '/api/v2/articles/%d' % (article_id,),
+                    'class': 'article',
+                },
+            },
+        }
+
+    def topic_id(self, article_id):
+
+        return (article_id - 1) % self.num_topics + 1
+
+    def _project(self, entry, query):
+
+        if query.get('embed') and 'topic' in query['embed'].split(','):
+            topic_id = int(entry['_links']['topic']['href'].rsplit('/', 1)[1])
+            entry['_embedded'] = {'topic': self.topic(topic_id)}
+
+        if query.get('fields'):
+            fields = query['fields'].split(',') + ['_links', '_embedded']
+            entry = dict(
+                (key, value)
+                for key, value in entry.items()
+                if key in fields
+            )
+
+        return entry
+
+    def _page(self, path, query, total, build):
+
+        per_page = min(int(query.get('per_page', self.per_page)),
+                       self.max_per_page)
+        page = int(query.get('page', 1))
+        last = max(1, -(-total // per_page))
+        start = (page - 1) * per_page
+
+        def link(number):
+            params = dict(query, page=number, per_page=per_page)
+            return {
+                'href': '%s?%s' % (path, urlencode(sorted(params.items()))),
+                'class': 'page',
+            }
+
+        return {
+            'total_entries': total,
+            'page': page,
+            '_links': {
+                'self': link(page),
+                'first': link(1),
+                'last': link(last),
+                'previous': link(page - 1) if page > 1 else None,
+                'next': link(page + 1) if page < last else None,
+            },
+            '_embedded': {
+                'entries': [
+                    self._project(build(index), query)
+                    for index in range(start + 1, min(total, start + per_page) + 1)
+                ],
+            },
+        }
+
+    ROUTES = (
+        (r'^/api/v2/articles$', 'articles'),
+        (r'^/api/v2/articles/(\d+)$', 'show_article'),
+        (r'^/api/v2/articles/(\d+)/translations$', 'article_translations'),
+        (r'^/api/v2/topics$', 'topics'),
+        (r'^/api/v2/topics/(\d+)$', 'show_topic'),
+    )
+
+    def respond(self, url):
+        """Return (status, body dict) for a GET of url."""
+
+        scheme, netloc, path, query, fragment = urlsplit(url)
+        query = dict(parse_qsl(query))
+
+        for pattern, name in self.ROUTES:
+            match = re.match(pattern, path)
+            if match:
+                return getattr(self, name)(path, query, *match.groups())
+
+        return 404, {'message': 'Resource Not Found'}
+
+    def articles(self, path, query):
+
+        return 200, self._page(path, query, self.num_articles, self.article)
+
+    def show_article(self, path, query, id):
+
+        id = int(id)
+        if not 0 < id <= self.num_articles:
+            return 404, {'message': 'Resource Not Found'}
+
+        return 200, self._project(self.article(id), query)
+
+    def article_translations(self, path, query, id):
+
+        id = int(id)
+        if not 0 < id <= self.num_articles:
+            return 404, {'message': 'Resource Not Found'}
+
+        return 200, self._page(
+            path, query, len(self.locales),
+            lambda index: self.translation(id, self.locales[index - 1]),
+        )
+
+    def topics(self, path, query):
+
+        return 200, self._page(path, query, self.num_topics, self.topic)
+
+    def show_topic(self, path, query, id):
+
+        id = int(id)
+        if not 0 < id <= self.num_topics:
+            return 404, {'message': 'Resource Not Found'}
+
+        return 200, self._project(self.topic(id), query)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+
+
+class DeskServer(object):
+    """Serve a SyntheticDesk over HTTP from a background thread.
+
+    Every response is delayed by latency seconds.
+    """
+
+    def __init__(self, desk=None, latency=0.0, host='127.0.0.1', port=0):
+
+        self.desk = desk or SyntheticDesk()
+        self.latency = latency
+        self.requests = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            protocol_version = 'HTTP/1.1'
+            # Send each response in one write without Nagle delays, so
+            # small responses are not held back by delayed ACKs.
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                status, body = server.desk.respond(self.path)
+                content = json.dumps(body).encode('utf8')
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+
+                pass
+
+        self._server = _ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def url(self):
+
+        host, port = self._server.server_address[:2]
+
+        return 'http://%s:%d' % (host, port)
+
+    def start(self):
+
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+
+        return self.start()
+
+    def __exit__(self, *exc_info):
+
+        self.stop()
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--articles', type=int, default=10000)
+    parser.add_argument('--topics', type=int, default=100)
+    parser.add_argument('--locales', type=int, default=2)
+    parser.add_argument('--per-page', type=int, default=50)
+    parser.add_argument('--body-size', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    server = DeskServer(
+        SyntheticDesk(
+            articles=args.articles,
+            topics=args.topics,
+            locales=args.locales,
+            per_page=args.per_page,
+            body_size=args.body_size,
+        ),
+        latency=args.latency,
+        port=args.port,
+    )
+    print('Serving synthetic Desk API on %s' % (server.url,))
+    server._server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Measure the memory held by DeskObjects wrapping article entries.
+
+Run from the repository root::
+
+  $ python benchmarks/object_memory.py [count]
+
+Reports the bytes allocated for the parsed entries alone, and the
+additional bytes per object for wrapping them in DeskObjects.
+"""
+
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from deskapi.models import DeskApi2  # noqa
+from deskapi.tests.util import fixture  # noqa
+
+
+def measure(build):
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return result, after - before
+
+
+def main(count=100000):
+
+    template = fixture('article_template.json')
+    raw = [template % dict(index=index + 1) for index in range(count)]
+    session = DeskApi2(sitename='benchmark', auth=('user', 'password'))
+
+    entries, entry_bytes = measure(lambda: [json.loads(r) for r in raw])
+    objects, object_bytes = measure(
+        lambda: [session.object(entry) for entry in entries]
+    )
+
+    print('%d articles' % (count,))
+    print('entries:      %10d bytes (%d per entry)' % (
+        entry_bytes, entry_bytes // count))
+    print('DeskObjects:  %10d bytes (%d per object)' % (
+        object_bytes, object_bytes // count))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
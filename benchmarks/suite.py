@@ -0,0 +1,249 @@
+"""Benchmark DeskApi2 workflows against a local synthetic Desk server.
+
+Run from the repository root::
+
+  $ python benchmarks/suite.py --articles 100000 --output before.json
+  $ python benchmarks/suite.py --articles 100000 --compare before.json
+
+Measures pagination throughput (sequential, with page_workers, streamed
+and with a fields projection), by_id latency, DeskObject construction
+cost, the peak memory of loading every article and the time and peak
+memory of exporting them. Results are printed and can be written as
+JSON; --compare reports the change from an earlier result file and
+exits with status 1 if any measurement got worse by more than
+--threshold percent.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from deskapi.models import DeskApi2  # noqa
+from desk_server import DeskServer, SyntheticDesk  # noqa
+
+
+# measurements where a larger value is better; for all others, smaller is
+HIGHER_IS_BETTER = ('items_per_second',)
+
+
+def best_of(repeat, func):
+    """Return the smallest number of seconds func takes over repeat runs."""
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.time()
+        func()
+        timings.append(time.time() - start)
+
+    return min(timings)
+
+
+def pagination(server, args, **collection_kwargs):
+
+    def load():
+        api = DeskApi2(sitename='benchmark', base_url=server.url)
+        for article in api.articles(per_page=args.per_page,
+                                    **collection_kwargs):
+            pass
+
+    seconds = best_of(args.repeat, load)
+
+    return {
+        'seconds': seconds,
+        'items_per_second': args.articles / seconds,
+    }
+
+
+def by_id_latency(server, args):
+
+    api = DeskApi2(sitename='benchmark', base_url=server.url)
+    ids = random.Random(0).sample(
+        range(1, args.articles + 1), min(args.lookups, args.articles),
+    )
+
+    timings = []
+    for id in ids:
+        start = time.time()
+        api.articles().by_id(id)
+        timings.append(time.time() - start)
+    timings.sort()
+
+    return {
+        'mean_ms': 1000 * sum(timings) / len(timings),
+        'p50_ms': 1000 * timings[len(timings) // 2],
+        'p95_ms': 1000 * timings[int(len(timings) * 0.95)],
+    }
+
+
+def object_construction(server, args):
+
+    desk = SyntheticDesk(body_size=args.body_size)
+    count = min(args.articles, args.objects)
+    entries = [desk.article(id) for id in range(1, count + 1)]
+    api = DeskApi2(sitename='benchmark', base_url=server.url)
+
+    seconds = best_of(
+        args.repeat,
+        lambda: [api.object(entry) for entry in entries],
+    )
+
+    return {'us_per_object': 1e6 * seconds / count}
+
+
+def peak_memory(server, args):
+
+    api = DeskApi2(sitename='benchmark', base_url=server.url)
+    articles = api.articles(per_page=args.per_page)
+
+    gc.collect()
+    tracemalloc.start()
+    articles.items()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'peak_bytes': peak,
+        'retained_bytes_per_article': current // args.articles,
+    }
+
+
+def export_articles(server, args):
+
+    api = DeskApi2(sitename='benchmark', base_url=server.url)
+    directory = tempfile.mkdtemp()
+
+    try:
+        gc.collect()
+        tracemalloc.start()
+        start = time.time()
+        api.export(directory, resources=['articles'], per_page=args.per_page)
+        seconds = time.time() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(directory)
+
+    return {
+        'seconds': seconds,
+        'peak_bytes': peak,
+    }
+
+
+BENCHMARKS = (
+    ('pagination', lambda server, args: pagination(server, args)),
+    ('pagination_page_workers', lambda server, args: pagination(
+        server, args, page_workers=args.page_workers)),
+    ('pagination_stream', lambda server, args: pagination(
+        server, args, stream=True)),
+    ('pagination_fields', lambda server, args: pagination(
+        server, args, fields=['subject', 'position', 'updated_at'])),
+    ('by_id', by_id_latency),
+    ('object_construction', object_construction),
+    ('peak_memory', peak_memory),
+    ('export', export_articles),
+)
+
+
+def compare(results, baseline, threshold):
+    """Print the change of each measurement; return the regressions."""
+
+    regressions = []
+
+    for name, measurements in sorted(results.items()):
+        for metric, value in sorted(measurements.items()):
+            before = baseline.get(name, {}).get(metric)
+            if not before:
+                continue
+
+            change = 100.0 * (value - before) / before
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = ''
+            if worse > threshold:
+                flag = '  REGRESSION'
+                regressions.append((name, metric))
+
+            print('%-26s %-28s %14.3f %14.3f %+8.1f%%%s' % (
+                name, metric, before, value, change, flag))
+
+    return regressions
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--articles', type=int, default=10000)
+    parser.add_argument('--topics', type=int, default=100)
+    parser.add_argument('--locales', type=int, default=2)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--body-size', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds the server waits before responding')
+    parser.add_argument('--page-workers', type=int, default=8)
+    parser.add_argument('--lookups', type=int, default=200,
+                        help='by_id requests to time')
+    parser.add_argument('--objects', type=int, default=100000,
+                        help='entries to wrap when timing construction')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', action='append',
+                        help='run only the named benchmark; may be repeated')
+    parser.add_argument('--label', default='')
+    parser.add_argument('--output', help='write the results as JSON')
+    parser.add_argument('--compare', help='a JSON result file to compare to')
+    parser.add_argument('--threshold', type=float, default=10.0)
+    args = parser.parse_args()
+
+    desk = SyntheticDesk(
+        articles=args.articles,
+        topics=args.topics,
+        locales=args.locales,
+        per_page=args.per_page,
+        body_size=args.body_size,
+    )
+
+    results = {}
+    with DeskServer(desk, latency=args.latency) as server:
+        for name, benchmark in BENCHMARKS:
+            if args.only and name not in args.only:
+                continue
+            results[name] = benchmark(server, args)
+            print('%-26s %s' % (name, ', '.join(
+                '%s=%.3f' % item for item in sorted(results[name].items())
+            )))
+
+    report = {
+        'label': args.label,
+        'python': platform.python_version(),
+        'parameters': dict(
+            (key, value) for key, value in vars(args).items()
+            if key not in ('output', 'compare', 'label', 'only')
+        ),
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print('')
+        print('compared to %s' % (baseline.get('label') or args.compare,))
+        if compare(results, baseline['results'], args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,13 @@ if sys.version_info < (3, 3):
 install_requires = [
     'requests',
 ]
+if sys.version_info < (3, 2):
+    install_requires.append('futures')
+
+extras_require = {
+    # deskapi.aio uses async generators, new in Python 3.6.
+    'async:python_version >= "3.6"': ['aiohttp'],
+}
 
 
 setup(name='deskapi',
@@ -37,6 +44,7 @@ setup(name='deskapi',
       include_package_data=True,
       zip_safe=False,
       install_requires=install_requires,
+      extras_require=extras_require,
       tests_require=tests_require,
       test_suite='deskapi.tests',
 )
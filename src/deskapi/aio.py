@@ -0,0 +1,367 @@
+"""asyncio versions of the Desk API session, collections and objects.
+
+Requires Python 3.6+ and aiohttp. Collection and object classes are
+resolved through the same registry as ``DeskSession.register_class``;
+each registered class is combined with the matching async base so that
+hooks such as ``_create_kwargs`` are shared with the synchronous API.
+"""
+
+import asyncio
+import time
+
+import aiohttp
+
+from deskapi.models import (
+    DeskApi2,
+    DeskCollection,
+    DeskError,
+    DeskObject,
+    DeskSession,
+    DeskTranslationCollection,
+)
+
+
+class AsyncDeskSession(DeskSession):
+
+    __slots__ = ()
+
+    _ASYNC_TYPES = {}
+
+    # DeskBatch sends its requests synchronously.
+    batch = None
+
+    def __init__(self, *args, **kwargs):
+        """Create an asyncio session.
+
+        Response caches, rate limiters, retry policies and circuit breakers
+        are only applied to synchronous requests, so they are not
+        supported by the asyncio API.
+        """
+
+        for name in ('response_cache', 'rate_limiter', 'retry',
+                     'circuit_breaker'):
+            if kwargs.get(name) is not None:
+                raise TypeError('%s requires a synchronous DeskSession' % (
+                    name,
+                ))
+
+        super(AsyncDeskSession, self).__init__(*args, **kwargs)
+
+    def _create_session(self, auth, pool_size=None, cassette=None):
+        """Return a new aiohttp ClientSession with a keep-alive pool.
+
+        Must be called with a running event loop. Cassettes are not
+        supported by the asyncio API.
+        """
+
+        if cassette is not None:
+            raise TypeError('cassettes require a synchronous DeskSession')
+
+        if pool_size is None:
+            pool_size = self.DEFAULT_POOL_SIZE
+
+        if isinstance(auth, tuple):
+            auth = aiohttp.BasicAuth(*auth)
+
+        return aiohttp.ClientSession(
+            auth=auth,
+            headers={
+                'Accept': 'application/json',
+                'Content-Type': 'application/json',
+            },
+            connector=aiohttp.TCPConnector(limit_per_host=pool_size),
+        )
+
+    async def request(self, path, method='GET', params=None, data=None,
+                      page=None):
+
+        method = method.upper()
+        url = self._url(path, params)
+        request_kwargs = {}
+
+        if data:
+            request_kwargs['data'] = self._encode(data)
+
+        start = time.time()
+        async with self._session.request(
+                method,
+                url,
+                **request_kwargs) as r:
+
+            content = await r.read()
+
+        if self._hooks:
+            self._notify(
+                method, url, r.status, time.time() - start,
+                request_kwargs.get('data'), len(content), 1, page,
+            )
+
+        if r.status >= 400:
+            raise DeskError(str(r.status))
+
+        return self._codec.loads(content)
+
+    async def close(self):
+        """Close the underlying connection pool."""
+
+        await self._session.close()
+
+    async def __aenter__(self):
+
+        return self
+
+    async def __aexit__(self, *exc_info):
+
+        await self.close()
+
+    @classmethod
+    def _async_type(cls, klass):
+        """Return the async variant of a registered sync class."""
+
+        if issubclass(klass, AsyncDeskSession):
+            return klass
+
+        if klass not in cls._ASYNC_TYPES:
+            for sync_base, async_base in _ASYNC_BASES:
+                if issubclass(klass, sync_base):
+                    break
+
+            if klass is sync_base:
+                cls._ASYNC_TYPES[klass] = async_base
+            else:
+                cls._ASYNC_TYPES[klass] = type(
+                    'Async%s' % (klass.__name__,),
+                    (async_base, klass),
+                    {'__slots__': ()},
+                )
+
+        return cls._ASYNC_TYPES[klass]
+
+    def _object_class(self, name):
+        """Return the async variant of the class registered for name."""
+
+        return self._async_type(
+            super(AsyncDeskSession, self)._object_class(name)
+        )
+
+    def collection(self, link_info, *args, **kwargs):
+        """Return an AsyncDeskCollection for the link_info."""
+
+        object_class = self._async_type(
+            self._COLLECTIONS.get(
+                link_info['class'],
+                DeskCollection,
+            )
+        )
+        kwargs.update(**self._session_kwargs())
+
+        return object_class(link_info['href'], *args, **kwargs)
+
+
+class AsyncDeskApi2(AsyncDeskSession, DeskApi2):
+
+    # Exports stream pages through synchronous requests.
+    export = None
+
+
+class AsyncDeskCollection(AsyncDeskSession, DeskCollection):
+
+    # Length, iteration, indexing and containment need network access;
+    # use ``await items()`` or ``async for`` instead.
+    __len__ = __iter__ = __getitem__ = __contains__ = None
+
+    # Bulk writes go through the synchronous DeskBatch.
+    bulk_create = bulk_update = None
+
+    def __init__(self, *args, **kwargs):
+
+        if kwargs.get('stream'):
+            raise TypeError('stream requires a synchronous DeskCollection')
+
+        super(AsyncDeskCollection, self).__init__(*args, **kwargs)
+
+    async def items(self):
+
+        if self._cache is None:
+            self._cache = [
+                item
+                async for items in self._iter_pages()
+                for item in items
+            ]
+
+        return self._cache
+
+    async def __aiter__(self):
+
+        async for items in self._iter_pages():
+            for item in items:
+                yield item
+
+    async def _iter_pages(self):
+        """Yield the items of each page in order, fetching as needed.
+
+        Once the number of pages is known, up to page_workers pages are
+        requested at a time; otherwise pages are requested one by one.
+        """
+
+        items = await self._load_page(1)
+        num_pages = self._num_pages()
+
+        if num_pages is None:
+            page = 1
+            while items:
+                yield items
+                page += 1
+                items = await self._load_page(page)
+            return
+
+        yield items
+
+        step = self._page_workers or 1
+        for start in range(2, num_pages + 1, step):
+            pages = range(start, min(start + step, num_pages + 1))
+            await asyncio.gather(*[self._load_page(page) for page in pages])
+
+            for page in pages:
+                yield self._page_map[page]
+
+    async def _request_page(self, href, page):
+
+        return await self.request(href, page=page)
+
+    async def _load_page(self, page):
+        """Return the items on page, fetching it if needed.
+
+        Pages past the end of the collection are empty.
+        """
+
+        if self._page_template is None and not self._page_map:
+            self._store_page(1, await self._request_page(self._path, 1))
+
+        if page in self._page_map:
+            return self._page_map[page]
+
+        if self._page_template is not None:
+            num_pages = self._num_pages()
+            if num_pages is None or page <= num_pages:
+                return self._store_page(
+                    page,
+                    await self._request_page(self._page_href(page), page),
+                )
+        else:
+            last = max(self._page_map)
+            while last < page and self._next_hrefs[last]:
+                self._store_page(
+                    last + 1,
+                    await self._request_page(self._next_hrefs[last], last + 1),
+                )
+                last += 1
+
+        return self._page_map.get(page, [])
+
+    async def create(self, **kwargs):
+        """Create a new item in the Collection and return it."""
+
+        return self.object(
+            await self.request(
+                self._items_path(),
+                method='POST',
+                data=self._create_kwargs(kwargs),
+            )
+        )
+
+    async def by_id(self, id, embed=None, fields=None):
+        """Return an item of this collection based on its ID."""
+
+        params = self._item_params(embed, fields)
+        item = self._mapped(id)
+        if item is not None and item._satisfies(params):
+            return item
+
+        return self.object(
+            await self.request(
+                '%s/%s' % (self._items_path(), id),
+                method='GET',
+                params=params,
+            ),
+            fields=(params or {}).get('fields'),
+        )
+
+    async def get_many(self, ids):
+        """Return the items for ids, in order, requested concurrently."""
+
+        unique = list(dict.fromkeys(ids))
+        items = dict(zip(
+            unique,
+            await asyncio.gather(*[self.by_id(id) for id in unique]),
+        ))
+
+        return [items[id] for id in ids]
+
+
+class AsyncDeskTranslationCollection(AsyncDeskCollection,
+                                     DeskTranslationCollection):
+
+    async def items(self):
+
+        if self._locale_cache is None:
+            items = await super(AsyncDeskTranslationCollection, self).items()
+
+            self._locale_cache = dict([
+                (t.locale, t)
+                for t in items
+            ])
+
+        return self._locale_cache
+
+    async def create(self, **kwargs):
+
+        translation = await super(
+            AsyncDeskTranslationCollection, self).create(**kwargs)
+        if self._locale_cache is not None:
+            self._locale_cache[translation.locale] = translation
+
+        return translation
+
+
+class AsyncDeskObject(AsyncDeskSession, DeskObject):
+
+    __slots__ = ()
+
+    async def save(self):
+        """Save this Desk object with new assignments."""
+
+        return await self.update(**self._changed)
+
+    async def update(self, **kwargs):
+        """Update this Desk object with kwargs, returning an updated version.
+
+        With an identity map the updated version is this object, refreshed.
+        """
+
+        response = await self.request(
+            self.api_href,
+            method='patch',
+            data=kwargs,
+        )
+
+        self._saved(kwargs)
+
+        return self.object(response)
+
+    def _load_fields(self, key):
+
+        # Attribute access cannot wait for a request.
+        raise KeyError(
+            '%r was not fetched; request it in fields or fetch the '
+            'object without fields' % (key,)
+        )
+
+
+# Most specific first: the first sync base a registered class derives
+# from selects the async base it is combined with.
+_ASYNC_BASES = (
+    (DeskTranslationCollection, AsyncDeskTranslationCollection),
+    (DeskCollection, AsyncDeskCollection),
+    (DeskObject, AsyncDeskObject),
+)
@@ -0,0 +1,137 @@
+"""OAuth 1.0a request signing for Desk sessions.
+
+``OAuth1Signer`` is a Requests auth object: pass one to ``DeskSession``
+as ``auth`` and every request made by the session is signed with it.
+The signing key and the static OAuth parameters are computed once, when
+the signer is created, so signing a request only hashes its base string.
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import time
+
+import requests.auth
+
+from deskapi.six import (
+    parse_qsl,
+    quote,
+    unicode_str,
+    urlsplit,
+)
+
+
+FORM_CONTENT_TYPE = 'application/x-www-form-urlencoded'
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def _quote(value):
+    """Percent encode value as RFC 5849 requires."""
+
+    return quote(unicode_str(value).encode('utf8'), safe='~')
+
+
+def _nonce():
+
+    return binascii.hexlify(os.urandom(16)).decode('ascii')
+
+
+def _normalized_url(scheme, netloc):
+
+    scheme = scheme.lower()
+    netloc = netloc.lower()
+    host, _, port = netloc.rpartition(':')
+    if host and port == DEFAULT_PORTS.get(scheme):
+        netloc = host
+
+    return '%s://%s' % (scheme, netloc)
+
+
+class OAuth1Signer(requests.auth.AuthBase):
+    """Sign requests with HMAC-SHA1 using the given consumer and token.
+
+    clock and nonce are the callables used for oauth_timestamp and
+    oauth_nonce.
+    """
+
+    def __init__(self, consumer_key, consumer_secret, token=None,
+                 token_secret=None, clock=time.time, nonce=_nonce):
+
+        key = '%s&%s' % (_quote(consumer_secret), _quote(token_secret or ''))
+        self._hmac = hmac.new(key.encode('ascii'), digestmod=hashlib.sha1)
+
+        params = [
+            ('oauth_consumer_key', consumer_key),
+            ('oauth_signature_method', 'HMAC-SHA1'),
+            ('oauth_version', '1.0'),
+        ]
+        if token is not None:
+            params.append(('oauth_token', token))
+        self._params = [
+            (_quote(name), _quote(value)) for name, value in params
+        ]
+        self._header = 'OAuth ' + ', '.join(
+            '%s="%s"' % param for param in self._params
+        )
+
+        self._clock = clock
+        self._nonce = nonce
+
+    def signature(self, method, url, body=None, timestamp=None, nonce=None):
+        """Return the base64 signature of a request."""
+
+        scheme, netloc, path, query, fragment = urlsplit(url)
+
+        params = self._params + [
+            ('oauth_nonce', _quote(nonce)),
+            ('oauth_timestamp', _quote(timestamp)),
+        ]
+        params.extend(
+            (_quote(name), _quote(value))
+            for name, value in parse_qsl(query, keep_blank_values=True)
+        )
+        if body:
+            params.extend(
+                (_quote(name), _quote(value))
+                for name, value in parse_qsl(unicode_str(body),
+                                             keep_blank_values=True)
+            )
+        params.sort()
+
+        base_string = '%s&%s&%s' % (
+            method.upper(),
+            _quote(_normalized_url(scheme, netloc) + (path or '/')),
+            _quote('&'.join('%s=%s' % param for param in params)),
+        )
+
+        digest = self._hmac.copy()
+        digest.update(base_string.encode('ascii'))
+
+        return base64.b64encode(digest.digest()).decode('ascii')
+
+    def __call__(self, request):
+
+        timestamp = str(int(self._clock()))
+        nonce = self._nonce()
+
+        body = None
+        content_type = request.headers.get('Content-Type') or ''
+        if content_type.startswith(FORM_CONTENT_TYPE):
+            body = request.body
+
+        request.headers['Authorization'] = (
+            '%s, oauth_nonce="%s", oauth_timestamp="%s", '
+            'oauth_signature="%s"' % (
+                self._header,
+                _quote(nonce),
+                timestamp,
+                _quote(self.signature(
+                    request.method, request.url, body, timestamp, nonce,
+                )),
+            )
+        )
+
+        return request
@@ -0,0 +1,168 @@
+"""Response caches for conditional GET requests.
+
+A cache is passed to ``DeskSession`` as ``response_cache``. GET response
+bodies are stored with their ``ETag`` and ``Last-Modified`` validators;
+repeated requests are sent with ``If-None-Match``/``If-Modified-Since``
+and a ``304 Not Modified`` response is answered from the cache.
+"""
+
+from collections import namedtuple, OrderedDict
+import hashlib
+import json
+import os
+import threading
+
+
+CachedResponse = namedtuple(
+    'CachedResponse',
+    ['content', 'etag', 'last_modified'],
+)
+
+
+class MemoryCache(object):
+    """Keep cached responses in memory.
+
+    Least recently used responses are evicted once the stored bodies
+    exceed max_size bytes.
+    """
+
+    DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+    def __init__(self, max_size=None):
+
+        self.max_size = max_size or self.DEFAULT_MAX_SIZE
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the CachedResponse for key, or None."""
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+
+        return entry
+
+    def set(self, key, entry):
+        """Store a CachedResponse for key, evicting old entries as needed."""
+
+        if len(entry.content) > self.max_size:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous.content)
+
+            self._entries[key] = entry
+            self.size += len(entry.content)
+
+            while self.size > self.max_size:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.content)
+
+    def __len__(self):
+
+        return len(self._entries)
+
+
+class FileCache(object):
+    """Keep cached responses as files in a directory.
+
+    Each response is stored in its own file, named for a hash of its key.
+    Least recently used files are removed once the directory holds more
+    than max_size bytes.
+    """
+
+    DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+    def __init__(self, directory, max_size=None):
+
+        self.directory = directory
+        self.max_size = max_size or self.DEFAULT_MAX_SIZE
+        self._lock = threading.Lock()
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        # filename -> size, in least recently used order
+        self._files = OrderedDict()
+        existing = [
+            (os.stat(os.path.join(directory, name)), name)
+            for name in os.listdir(directory)
+            if name.endswith('.cache')
+        ]
+        for stat, name in sorted(existing, key=lambda e: e[0].st_mtime):
+            self._files[name] = stat.st_size
+        self.size = sum(self._files.values())
+
+    def _filename(self, key):
+
+        return '%s.cache' % (hashlib.sha1(key.encode('utf8')).hexdigest(),)
+
+    def get(self, key):
+        """Return the CachedResponse for key, or None."""
+
+        filename = self._filename(key)
+        path = os.path.join(self.directory, filename)
+
+        with self._lock:
+            if filename not in self._files:
+                return None
+
+            try:
+                with open(path, 'rb') as cache_file:
+                    header = json.loads(cache_file.readline().decode('utf8'))
+                    content = cache_file.read()
+            except (IOError, OSError, ValueError):
+                return None
+
+            self._files[filename] = self._files.pop(filename)
+
+        if header.get('key') != key:
+            return None
+
+        return CachedResponse(
+            content=content,
+            etag=header.get('etag'),
+            last_modified=header.get('last_modified'),
+        )
+
+    def set(self, key, entry):
+        """Store a CachedResponse for key, evicting old files as needed."""
+
+        filename = self._filename(key)
+        header = json.dumps({
+            'key': key,
+            'etag': entry.etag,
+            'last_modified': entry.last_modified,
+        }).encode('utf8') + b'\n'
+        size = len(header) + len(entry.content)
+
+        if size > self.max_size:
+            return
+
+        with self._lock:
+            temp_path = os.path.join(self.directory, filename + '.tmp')
+            with open(temp_path, 'wb') as cache_file:
+                cache_file.write(header)
+                cache_file.write(entry.content)
+            os.rename(temp_path, os.path.join(self.directory, filename))
+
+            self.size -= self._files.pop(filename, 0)
+            self._files[filename] = size
+            self.size += size
+
+            while self.size > self.max_size:
+                evicted, evicted_size = self._files.popitem(last=False)
+                self.size -= evicted_size
+                try:
+                    os.remove(os.path.join(self.directory, evicted))
+                except OSError:
+                    pass
+
+    def __len__(self):
+
+        return len(self._files)
@@ -0,0 +1,222 @@
+"""Record and replay Desk API traffic.
+
+A ``Cassette`` passed to ``DeskSession`` as ``cassette`` is mounted as
+the transport for the site. In record mode every request and response,
+with headers, bodies and timing, is appended to a gzipped JSON lines
+archive; close the cassette to finish it. In replay mode responses are
+served from the archive without network access, optionally delayed by
+the time the original response took.
+"""
+
+import base64
+from collections import deque
+import datetime
+import gzip
+import json
+import threading
+import time
+
+import requests
+import requests.adapters
+from requests.structures import CaseInsensitiveDict
+
+
+# Request headers which are not written to the archive.
+PRIVATE_HEADERS = ('authorization', 'cookie')
+
+
+class CassetteMiss(requests.RequestException):
+    """No recorded response matches a request being replayed."""
+
+
+def _encode_body(body):
+
+    if body is None:
+        return None, None
+    if not isinstance(body, bytes):
+        return body, 'text'
+
+    try:
+        return body.decode('utf8'), 'text'
+    except UnicodeDecodeError:
+        return base64.b64encode(body).decode('ascii'), 'base64'
+
+
+def _decode_body(body, encoding):
+
+    if body is None:
+        return b''
+    if encoding == 'base64':
+        return base64.b64decode(body)
+
+    return body.encode('utf8')
+
+
+def _key(method, url, body):
+
+    body = _decode_body(*_encode_body(body))
+
+    return (method.upper(), url, body)
+
+
+class Cassette(object):
+    """An archive of request/response pairs at path.
+
+    mode is 'record' or 'replay'. When replaying, identical requests are
+    answered with their recorded responses in order, the last one being
+    repeated once they run out. If latency is True, replayed responses
+    wait as long as the recorded ones took.
+    """
+
+    RECORD = 'record'
+    REPLAY = 'replay'
+
+    def __init__(self, path, mode=REPLAY, latency=False, sleep=time.sleep):
+
+        if mode not in (self.RECORD, self.REPLAY):
+            raise ValueError('mode must be %r or %r' % (self.RECORD, self.REPLAY))
+
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._archive = None
+        self._responses = {}
+
+        if mode == self.RECORD:
+            self._archive = gzip.open(path, 'wb')
+        else:
+            self._load()
+
+    def _load(self):
+
+        with gzip.open(self.path, 'rb') as archive:
+            for line in archive:
+                record = json.loads(line.decode('utf8'))
+                key = _key(
+                    record['method'],
+                    record['url'],
+                    _decode_body(record['request_body'],
+                                 record['request_body_encoding']),
+                )
+                self._responses.setdefault(key, deque()).append(record)
+
+    def adapter(self, **kwargs):
+        """Return the transport adapter for this cassette's mode."""
+
+        if self.mode == self.RECORD:
+            return RecordingAdapter(self, **kwargs)
+
+        return ReplayAdapter(self)
+
+    def record(self, request, response, elapsed):
+        """Append a request, its response and the seconds it took."""
+
+        request_body, request_body_encoding = _encode_body(request.body)
+        body, body_encoding = _encode_body(response.content)
+
+        record = json.dumps({
+            'method': request.method,
+            'url': request.url,
+            'request_headers': dict(
+                (name, value)
+                for name, value in request.headers.items()
+                if name.lower() not in PRIVATE_HEADERS
+            ),
+            'request_body': request_body,
+            'request_body_encoding': request_body_encoding,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+            'body': body,
+            'body_encoding': body_encoding,
+            'elapsed': elapsed,
+            'recorded_at': time.time(),
+        }, sort_keys=True)
+
+        with self._lock:
+            self._archive.write(record.encode('utf8') + b'\n')
+
+    def replay(self, request):
+        """Return the recorded response to request."""
+
+        with self._lock:
+            records = self._responses.get(
+                _key(request.method, request.url, request.body),
+            )
+            if not records:
+                raise CassetteMiss(
+                    'no recorded response for %s %s' % (
+                        request.method, request.url),
+                    request=request,
+                )
+            record = records.popleft() if len(records) > 1 else records[0]
+
+        if self.latency:
+            self._sleep(record['elapsed'])
+
+        response = requests.Response()
+        response.status_code = record['status']
+        response.reason = record['reason']
+        response.headers = CaseInsensitiveDict(record['headers'])
+        response._content = _decode_body(record['body'], record['body_encoding'])
+        response._content_consumed = True
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers)
+        response.url = request.url
+        response.request = request
+        response.elapsed = datetime.timedelta(seconds=record['elapsed'])
+
+        return response
+
+    def close(self):
+        """Finish writing the archive, when recording."""
+
+        with self._lock:
+            if self._archive is not None:
+                self._archive.close()
+                self._archive = None
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc_info):
+
+        self.close()
+
+
+class RecordingAdapter(requests.adapters.HTTPAdapter):
+
+    def __init__(self, cassette, **kwargs):
+
+        self.cassette = cassette
+
+        super(RecordingAdapter, self).__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+
+        start = time.time()
+        response = super(RecordingAdapter, self).send(request, **kwargs)
+        self.cassette.record(request, response, time.time() - start)
+
+        return response
+
+
+class ReplayAdapter(requests.adapters.BaseAdapter):
+
+    def __init__(self, cassette):
+
+        self.cassette = cassette
+
+        super(ReplayAdapter, self).__init__()
+
+    def send(self, request, **kwargs):
+
+        return self.cassette.replay(request)
+
+    def close(self):
+
+        pass
@@ -0,0 +1,215 @@
+"""JSON encoding and decoding for Desk API requests.
+
+A codec is passed to ``DeskSession`` as ``codec``; by default the fastest
+installed of orjson, ujson and the standard library json module is used.
+``PageStream`` parses a page response incrementally, yielding the entries
+of ``_embedded.entries`` one at a time without buffering the whole body.
+"""
+
+import codecs
+import json
+
+
+class StdlibCodec(object):
+
+    name = 'json'
+
+    def loads(self, data):
+
+        if isinstance(data, bytes):
+            data = data.decode('utf8')
+
+        return json.loads(data)
+
+    def dumps(self, obj):
+
+        return json.dumps(obj)
+
+
+class OrjsonCodec(object):
+
+    name = 'orjson'
+
+    def __init__(self):
+
+        import orjson
+        self._orjson = orjson
+
+    def loads(self, data):
+
+        return self._orjson.loads(data)
+
+    def dumps(self, obj):
+
+        return self._orjson.dumps(obj)
+
+
+class UjsonCodec(object):
+
+    name = 'ujson'
+
+    def __init__(self):
+
+        import ujson
+        self._ujson = ujson
+
+    def loads(self, data):
+
+        return self._ujson.loads(data)
+
+    def dumps(self, obj):
+
+        return self._ujson.dumps(obj)
+
+
+def default_codec():
+    """Return the fastest available codec."""
+
+    for codec_class in (OrjsonCodec, UjsonCodec):
+        try:
+            return codec_class()
+        except ImportError:
+            pass
+
+    return StdlibCodec()
+
+
+class PageStream(object):
+    """Parse a page response incrementally from an iterable of byte chunks.
+
+    Iterating yields each entry of ``_embedded.entries`` as it is parsed.
+    Once iteration is finished, ``page`` holds the rest of the page, such
+    as ``total_entries`` and ``_links``, without the entries.
+    """
+
+    WHITESPACE = ' \t\r\n'
+    DELIMITERS = WHITESPACE + ',]}'
+
+    def __init__(self, chunks):
+
+        self.page = {}
+
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+
+    def _fill(self, size=0):
+        """Append chunks to the buffer, dropping consumed text.
+
+        Chunks are read until at least size more characters have been
+        read, or one chunk if size is 0. Returns False at the end of the
+        stream.
+        """
+
+        parts = [self._buffer[self._pos:]]
+        read = 0
+        for chunk in self._chunks:
+            if chunk:
+                parts.append(self._text.decode(chunk))
+                read += len(parts[-1])
+                if read >= size:
+                    break
+
+        if len(parts) == 1:
+            return False
+
+        self._buffer = ''.join(parts)
+        self._pos = 0
+
+        return True
+
+    def _peek(self):
+        """Return the next non-whitespace character without consuming it."""
+
+        while True:
+            while (self._pos < len(self._buffer) and
+                   self._buffer[self._pos] in self.WHITESPACE):
+                self._pos += 1
+
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+
+            if not self._fill():
+                raise ValueError('unexpected end of page')
+
+    def _expect(self, chars):
+        """Consume and return the next character, which must be in chars."""
+
+        char = self._peek()
+        if char not in chars:
+            raise ValueError('expected one of %r, found %r' % (chars, char))
+        self._pos += 1
+
+        return char
+
+    def _value(self):
+        """Decode and consume the JSON value at the current position."""
+
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                # Decoding starts over from the value's start each time,
+                # so read at least as much again before retrying; growing
+                # by a chunk at a time would be quadratic in its size.
+                if not self._fill(len(self._buffer) - self._pos):
+                    raise
+                continue
+
+            # A number cut off by the end of a chunk (such as "3." or
+            # "1e") may continue in the next one.
+            if (isinstance(value, (int, float)) and
+                    not isinstance(value, bool) and
+                    (end == len(self._buffer) or
+                     self._buffer[end] not in self.DELIMITERS) and
+                    self._fill()):
+                continue
+
+            self._pos = end
+            return value
+
+    def _members(self):
+        """Yield the keys of an object; the caller consumes each value."""
+
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+
+        while True:
+            key = self._value()
+            self._expect(':')
+            yield key
+            if self._expect(',}') == '}':
+                return
+
+    def _elements(self):
+        """Yield the decoded elements of an array."""
+
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+
+        while True:
+            yield self._value()
+            if self._expect(',]') == ']':
+                return
+
+    def __iter__(self):
+
+        for key in self._members():
+            if key != '_embedded' or self._peek() != '{':
+                self.page[key] = self._value()
+                continue
+
+            embedded = self.page[key] = {}
+            for embedded_key in self._members():
+                if embedded_key == 'entries' and self._peek() == '[':
+                    for entry in self._elements():
+                        yield entry
+                else:
+                    embedded[embedded_key] = self._value()
@@ -0,0 +1,138 @@
+"""Export a site's topics, articles and translations to JSON lines files.
+
+``export()`` (also available as ``DeskApi2.export``) writes one file per
+resource to a directory, each line holding one entry exactly as the API
+returned it. Pages are streamed with ``PageStream`` and every entry is
+written as soon as it is parsed; entries are never wrapped in
+``DeskObject``s or kept, so memory use does not grow with the size of
+the site. A ``manifest.json`` alongside records how many entries each
+file holds and the latest ``updated_at`` among them.
+"""
+
+import datetime
+import gzip
+import json
+import os
+
+
+RESOURCES = ('topics', 'articles', 'translations')
+
+MANIFEST = 'manifest.json'
+
+
+class _Writer(object):
+    """Write entries of one resource as lines, tracking the manifest."""
+
+    def __init__(self, directory, name, codec, compress):
+
+        self.filename = '%s.jsonl%s' % (name, '.gz' if compress else '')
+        self.count = 0
+        self.updated_at = None
+
+        self._codec = codec
+        path = os.path.join(directory, self.filename)
+        self._file = gzip.open(path, 'wb') if compress else open(path, 'wb')
+
+    def write(self, entry):
+
+        line = self._codec.dumps(entry)
+        if not isinstance(line, bytes):
+            line = line.encode('utf8')
+        self._file.write(line + b'\n')
+
+        self.count += 1
+        updated_at = entry.get('updated_at')
+        if updated_at and (self.updated_at is None or
+                           updated_at > self.updated_at):
+            self.updated_at = updated_at
+
+    def close(self):
+
+        self._file.close()
+
+    def manifest(self):
+
+        return {
+            'file': self.filename,
+            'count': self.count,
+            'updated_at': self.updated_at,
+        }
+
+
+def _pages(api, href, per_page=None):
+    """Yield a PageStream for each page of the collection at href.
+
+    Each page must be consumed before the next is requested.
+    """
+
+    params = {'per_page': per_page} if per_page else None
+    page = 1
+    while href:
+        stream = api.request(href, params=params, stream=True, page=page)
+        yield stream
+
+        next_link = (stream.page.get('_links') or {}).get('next')
+        href = next_link['href'] if next_link else None
+        params = None
+        page += 1
+
+
+def export(api, path, resources=RESOURCES, compress=False, per_page=None):
+    """Export the resources of the site api to the directory path.
+
+    resources names any of 'topics', 'articles' and 'translations';
+    translations are those of the topics and articles exported, or of
+    all topics and articles if only translations are. Files
+    are gzipped if compress is True. Returns the manifest, which is also
+    written to path.
+    """
+
+    unknown = set(resources) - set(RESOURCES)
+    if unknown:
+        raise ValueError('unknown resources: %s' % (', '.join(sorted(unknown)),))
+
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    writers = dict(
+        (name, _Writer(path, name, api._codec, compress))
+        for name in RESOURCES
+        if name in resources
+    )
+    translations = writers.get('translations')
+    parents = [name for name in ('topics', 'articles') if name in writers]
+
+    try:
+        for name in parents or ('topics', 'articles'):
+            writer = writers.get(name)
+
+            for page in _pages(api, name, per_page):
+                # Translations are exported after each page, so only one
+                # page of translation links is held at a time.
+                links = []
+                for entry in page:
+                    if writer is not None:
+                        writer.write(entry)
+                    link = entry.get('_links', {}).get('translations')
+                    if translations is not None and link:
+                        links.append(link['href'])
+
+                for href in links:
+                    for translation_page in _pages(api, href):
+                        for translation in translation_page:
+                            translations.write(translation)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    manifest = {
+        'sitename': api._sitename,
+        'exported_at': datetime.datetime.utcnow().isoformat() + 'Z',
+        'resources': dict(
+            (name, writer.manifest()) for name, writer in writers.items()
+        ),
+    }
+    with open(os.path.join(path, MANIFEST), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+    return manifest
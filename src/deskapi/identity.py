@@ -0,0 +1,81 @@
+"""An identity map of the objects loaded through a session.
+
+An ``IdentityMap`` passed to ``DeskSession`` as ``identity_map`` keeps
+one live ``DeskObject`` per ``api_href``. Entries fetched again for an
+object already in the map refresh that object in place, and ``by_id``
+returns a mapped object without a request while it is fresh.
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class IdentityMap(object):
+    """Map api_hrefs to objects.
+
+    Least recently used objects are evicted once more than max_size are
+    held, and objects not stored again within ttl seconds expire. Either
+    limit may be None.
+    """
+
+    def __init__(self, max_size=None, ttl=None, clock=time.time):
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._clock = clock
+        self._lock = threading.Lock()
+        # api_href -> (object, stored at), in least recently used order
+        self._objects = OrderedDict()
+
+    def get(self, api_href):
+        """Return the fresh object for api_href, or None."""
+
+        with self._lock:
+            entry = self._objects.pop(api_href, None)
+
+            if entry is not None and self._expired(entry[1]):
+                self.evictions += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._objects[api_href] = entry
+            self.hits += 1
+
+        return entry[0]
+
+    def add(self, obj):
+        """Store obj under its api_href, evicting old objects as needed."""
+
+        with self._lock:
+            self._objects.pop(obj.api_href, None)
+            self._objects[obj.api_href] = (obj, self._clock())
+
+            while self.max_size is not None and len(self._objects) > self.max_size:
+                self._objects.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, api_href):
+
+        with self._lock:
+            self._objects.pop(api_href, None)
+
+    def clear(self):
+
+        with self._lock:
+            self._objects.clear()
+
+    def _expired(self, stored_at):
+
+        return self.ttl is not None and self._clock() - stored_at >= self.ttl
+
+    def __len__(self):
+
+        return len(self._objects)
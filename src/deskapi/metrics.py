@@ -0,0 +1,251 @@
+"""Request instrumentation for Desk API sessions.
+
+Callables passed to ``DeskSession`` as ``hooks`` are called with a
+``RequestEvent`` after every request made through the session, including
+those of its collections and objects. ``RequestMetrics`` is such a hook;
+it counts requests, errors, retries and bytes and keeps a latency
+histogram per endpoint, which can be read as a dict or exported in the
+Prometheus text format or as StatsD lines.
+"""
+
+from collections import namedtuple
+import re
+import threading
+
+from deskapi.six import urlsplit
+
+
+_RequestEvent = namedtuple(
+    'RequestEvent',
+    [
+        'method',
+        'url',
+        'endpoint',
+        'status',
+        'elapsed',
+        'request_bytes',
+        'response_bytes',
+        'attempts',
+        'source',
+        'page',
+    ],
+)
+
+
+class RequestEvent(_RequestEvent):
+    """A request made through a session.
+
+    endpoint is the URL path with ids and locales replaced by
+    placeholders. status is None if no response was received, and
+    response_bytes is None if the body was not read. source is the
+    session, collection or object which made the request, and page the
+    collection page requested, if any.
+    """
+
+    __slots__ = ()
+
+    @property
+    def retries(self):
+
+        return max((self.attempts or 1) - 1, 0)
+
+
+def endpoint_template(url):
+    """Return the path of url with ids and locales replaced.
+
+    For example ``/api/v2/articles/42/translations/es`` becomes
+    ``/api/v2/articles/{id}/translations/{locale}``.
+    """
+
+    segments = urlsplit(url)[2].split('/')
+
+    for index, segment in enumerate(segments):
+        if segment.isdigit():
+            segments[index] = '{id}'
+        elif index and segments[index - 1] == 'translations':
+            segments[index] = '{locale}'
+
+    return '/'.join(segments)
+
+
+class _EndpointMetrics(object):
+
+    def __init__(self, buckets):
+
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.statuses = {}
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(buckets)
+
+    def add(self, event, buckets):
+
+        status = 'error' if event.status is None else str(event.status)
+
+        self.requests += 1
+        if event.status is None or event.status >= 400:
+            self.errors += 1
+        self.retries += event.retries
+        self.request_bytes += event.request_bytes or 0
+        self.response_bytes += event.response_bytes or 0
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+        self.latency_sum += event.elapsed
+        for index, bound in enumerate(buckets):
+            if event.elapsed <= bound:
+                self.latency_buckets[index] += 1
+                break
+
+
+def _statsd_name(name):
+
+    return re.sub(r'[^A-Za-z0-9_]+', '_', name).strip('_')
+
+
+class RequestMetrics(object):
+    """Aggregate request events per method and endpoint.
+
+    Latencies are counted in histogram buckets with the given upper
+    bounds, in seconds.
+    """
+
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=None):
+
+        self.buckets = tuple(sorted(buckets or self.DEFAULT_BUCKETS))
+
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def __call__(self, event):
+
+        key = (event.method, event.endpoint)
+
+        with self._lock:
+            metrics = self._endpoints.get(key)
+            if metrics is None:
+                metrics = self._endpoints[key] = _EndpointMetrics(self.buckets)
+            metrics.add(event, self.buckets)
+
+    def reset(self):
+
+        with self._lock:
+            self._endpoints = {}
+
+    def _snapshot(self):
+
+        with self._lock:
+            return sorted(
+                (key, self._copy(metrics))
+                for key, metrics in self._endpoints.items()
+            )
+
+    def _copy(self, metrics):
+
+        copy = _EndpointMetrics(self.buckets)
+        copy.__dict__.update(metrics.__dict__)
+        copy.statuses = dict(metrics.statuses)
+        copy.latency_buckets = list(metrics.latency_buckets)
+
+        return copy
+
+    def as_dict(self):
+        """Return the metrics keyed by "METHOD endpoint".
+
+        Histogram bucket counts are cumulative, as in Prometheus.
+        """
+
+        result = {}
+
+        for (method, endpoint), metrics in self._snapshot():
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets, metrics.latency_buckets):
+                cumulative += count
+                buckets[bound] = cumulative
+            buckets['+Inf'] = metrics.requests
+
+            result['%s %s' % (method, endpoint)] = {
+                'requests': metrics.requests,
+                'errors': metrics.errors,
+                'retries': metrics.retries,
+                'request_bytes': metrics.request_bytes,
+                'response_bytes': metrics.response_bytes,
+                'statuses': metrics.statuses,
+                'latency': {
+                    'sum': metrics.latency_sum,
+                    'count': metrics.requests,
+                    'buckets': buckets,
+                },
+            }
+
+        return result
+
+    def prometheus(self, prefix='deskapi'):
+        """Return the metrics in the Prometheus text exposition format."""
+
+        requests = []
+        counters = {'retries': [], 'request_bytes': [], 'response_bytes': []}
+        durations = []
+
+        for (method, endpoint), metrics in self._snapshot():
+            labels = 'method="%s",endpoint="%s"' % (method, endpoint)
+
+            for status, count in sorted(metrics.statuses.items()):
+                requests.append('%s_requests_total{%s,status="%s"} %d' % (
+                    prefix, labels, status, count))
+            for name in sorted(counters):
+                counters[name].append('%s_%s_total{%s} %d' % (
+                    prefix, name, labels, getattr(metrics, name)))
+
+            cumulative = 0
+            for bound, count in zip(self.buckets, metrics.latency_buckets):
+                cumulative += count
+                durations.append(
+                    '%s_request_duration_seconds_bucket{%s,le="%r"} %d' % (
+                        prefix, labels, bound, cumulative))
+            durations.append(
+                '%s_request_duration_seconds_bucket{%s,le="+Inf"} %d' % (
+                    prefix, labels, metrics.requests))
+            durations.append('%s_request_duration_seconds_sum{%s} %r' % (
+                prefix, labels, metrics.latency_sum))
+            durations.append('%s_request_duration_seconds_count{%s} %d' % (
+                prefix, labels, metrics.requests))
+
+        lines = ['# TYPE %s_requests_total counter' % (prefix,)] + requests
+        for name in sorted(counters):
+            lines.append('# TYPE %s_%s_total counter' % (prefix, name))
+            lines.extend(counters[name])
+        lines.append(
+            '# TYPE %s_request_duration_seconds histogram' % (prefix,))
+        lines.extend(durations)
+
+        return '\n'.join(lines) + '\n'
+
+    def statsd(self, prefix='deskapi'):
+        """Return the metrics as a list of StatsD lines.
+
+        Counters are sent as increments, so call reset() once the lines
+        are sent. Latency is reported as the mean in milliseconds.
+        """
+
+        lines = []
+
+        for (method, endpoint), metrics in self._snapshot():
+            name = '%s.%s.%s' % (prefix, method.lower(), _statsd_name(endpoint))
+
+            lines.append('%s.requests:%d|c' % (name, metrics.requests))
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append('%s.status.%s:%d|c' % (name, status, count))
+            for counter in ('errors', 'retries', 'request_bytes',
+                            'response_bytes'):
+                lines.append('%s.%s:%d|c' % (
+                    name, counter, getattr(metrics, counter)))
+            lines.append('%s.latency:%.3f|ms' % (
+                name, 1000.0 * metrics.latency_sum / metrics.requests))
+
+        return lines
@@ -0,0 +1,297 @@
+"""A local SQLite mirror of a site's topics, articles and translations.
+
+``DeskMirror.sync()`` brings the mirror up to date. Only topics and
+articles updated since the last sync are requested, with Desk's
+``since_updated_at`` filter; those whose ``updated_at`` moved are
+rewritten and have their translations fetched again. A full sync lists
+everything, checks the translations of every object, since editing a
+translation leaves its parent's ``updated_at`` alone, and removes the
+objects no longer listed. The read methods return ``DeskObject``s built
+from the mirror without any network access.
+"""
+
+import calendar
+import datetime
+import json
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS objects (
+    api_href TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    parent_href TEXT,
+    seq INTEGER NOT NULL,
+    updated_at TEXT,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_kind ON objects (kind, seq);
+CREATE INDEX IF NOT EXISTS objects_parent ON objects (parent_href);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+
+class DeskMirror(object):
+
+    # (kind, DeskApi2 method) pairs mirrored by sync(), in order
+    RESOURCES = (
+        ('topic', 'topics'),
+        ('article', 'articles'),
+    )
+
+    def __init__(self, api, path, page_workers=None):
+        """Create a mirror of the site api, stored in the SQLite file path."""
+
+        self._api = api
+        self._path = path
+        self._page_workers = page_workers
+        self._local = threading.local()
+
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        """Return this thread's connection to the mirror database."""
+
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self._path)
+
+        return connection
+
+    def close(self):
+
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def sync(self, full=False):
+        """Bring the mirror up to date with the site.
+
+        Unless full is True, or the mirror holds nothing yet, only objects
+        updated since the newest one mirrored are requested, and objects
+        deleted from the site are kept; a full sync lists every object,
+        fetches the translations of each and removes those no longer
+        listed. Returns a dict counting the objects, translations
+        included, updated and deleted. The sync runs in a single
+        transaction; if it fails the mirror is unchanged.
+        """
+
+        counts = {'updated': 0, 'deleted': 0}
+        connection = self._connection()
+
+        with connection:
+            for kind, method in self.RESOURCES:
+                collection = getattr(self._api, method)(
+                    page_workers=self._page_workers,
+                )
+                since = None if full else self._since(connection, kind)
+                if since is not None:
+                    collection = collection.filter(since_updated_at=since)
+                self._sync_collection(
+                    connection, kind, collection, counts,
+                    full=since is None,
+                )
+
+            connection.execute(
+                'INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)',
+                ('last_sync', datetime.datetime.utcnow().isoformat() + 'Z'),
+            )
+
+        return counts
+
+    def _since(self, connection, kind):
+        """Return the Unix time of the newest mirrored object of kind.
+
+        Returns None if there is none. The site's own timestamps are used
+        so the filter does not depend on the local clock.
+        """
+
+        updated_at = connection.execute(
+            'SELECT MAX(updated_at) FROM objects WHERE kind = ?',
+            (kind,),
+        ).fetchone()[0]
+        if not updated_at:
+            return None
+
+        try:
+            return calendar.timegm(
+                time.strptime(updated_at, '%Y-%m-%dT%H:%M:%SZ'),
+            )
+        except ValueError:
+            return None
+
+    def _sync_collection(self, connection, kind, collection, counts,
+                         full=True):
+
+        stored = dict(
+            (api_href, (updated_at, seq))
+            for api_href, updated_at, seq in connection.execute(
+                'SELECT api_href, updated_at, seq FROM objects WHERE kind = ?',
+                (kind,),
+            )
+        )
+        next_seq = max([seq for _, seq in stored.values()] or [-1]) + 1
+
+        seen = set()
+        for index, item in enumerate(collection):
+            seen.add(item.api_href)
+            updated_at, seq = stored.get(item.api_href, (None, None))
+
+            # A full listing gives every object's position; otherwise
+            # objects keep theirs and new ones are added at the end.
+            if full:
+                seq = index
+            elif seq is None:
+                seq = next_seq
+                next_seq += 1
+
+            if (item.api_href in stored and
+                    updated_at == item._entry.get('updated_at')):
+                if full:
+                    connection.execute(
+                        'UPDATE objects SET seq = ? WHERE api_href = ?',
+                        (seq, item.api_href),
+                    )
+                    self._sync_translations(connection, item, counts)
+                continue
+
+            self._store(connection, item, kind, seq)
+            self._sync_translations(connection, item, counts)
+            counts['updated'] += 1
+
+        if not full:
+            return
+
+        for api_href in set(stored) - seen:
+            counts['deleted'] += connection.execute(
+                'DELETE FROM objects WHERE api_href = ? OR parent_href = ?',
+                (api_href, api_href),
+            ).rowcount
+
+    def _sync_translations(self, connection, item, counts):
+        """Fetch the translations of item and store those which moved.
+
+        Translations are compared by their own updated_at; those no
+        longer listed are removed.
+        """
+
+        link = item._links.get('translations')
+        if not link:
+            return
+
+        stored = dict(connection.execute(
+            'SELECT api_href, updated_at FROM objects WHERE parent_href = ?',
+            (item.api_href,),
+        ))
+
+        seen = set()
+        translations = item.translations.items()
+        for seq, locale in enumerate(sorted(translations)):
+            translation = translations[locale]
+            seen.add(translation.api_href)
+
+            if (translation.api_href in stored and
+                    stored[translation.api_href] ==
+                    translation._entry.get('updated_at')):
+                connection.execute(
+                    'UPDATE objects SET seq = ? WHERE api_href = ?',
+                    (seq, translation.api_href),
+                )
+                continue
+
+            self._store(
+                connection,
+                translation,
+                link['class'],
+                seq,
+                parent_href=item.api_href,
+            )
+            counts['updated'] += 1
+
+        for api_href in set(stored) - seen:
+            counts['deleted'] += connection.execute(
+                'DELETE FROM objects WHERE api_href = ?',
+                (api_href,),
+            ).rowcount
+
+    def _store(self, connection, item, kind, seq, parent_href=None):
+
+        connection.execute(
+            'INSERT OR REPLACE INTO objects '
+            '(api_href, kind, parent_href, seq, updated_at, entry) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (
+                item.api_href,
+                kind,
+                parent_href,
+                seq,
+                item._entry.get('updated_at'),
+                json.dumps(item._entry),
+            ),
+        )
+
+    @property
+    def last_sync(self):
+        """Return the UTC ISO timestamp of the last sync, or None."""
+
+        row = self._connection().execute(
+            'SELECT value FROM sync_state WHERE key = ?',
+            ('last_sync',),
+        ).fetchone()
+
+        return row and row[0]
+
+    def _objects(self, query, args):
+
+        return [
+            self._api.object(json.loads(entry))
+            for (entry,) in self._connection().execute(query, args)
+        ]
+
+    def get(self, api_href):
+        """Return the mirrored object for api_href, or None."""
+
+        objects = self._objects(
+            'SELECT entry FROM objects WHERE api_href = ?',
+            (api_href,),
+        )
+
+        return objects[0] if objects else None
+
+    def topics(self):
+        """Return the mirrored topics, in API order."""
+
+        return self._objects(
+            'SELECT entry FROM objects WHERE kind = ? ORDER BY seq',
+            ('topic',),
+        )
+
+    def articles(self):
+        """Return the mirrored articles, in API order."""
+
+        return self._objects(
+            'SELECT entry FROM objects WHERE kind = ? ORDER BY seq',
+            ('article',),
+        )
+
+    def translations(self, item):
+        """Return the mirrored translations of an object or api_href.
+
+        Like DeskObject.translations, the result is keyed by locale.
+        """
+
+        api_href = getattr(item, 'api_href', item)
+
+        return dict(
+            (translation.locale, translation)
+            for translation in self._objects(
+                'SELECT entry FROM objects WHERE parent_href = ? ORDER BY seq',
+                (api_href,),
+            )
+        )
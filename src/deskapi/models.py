@@ -1,12 +1,126 @@
-import json
+from concurrent.futures import ThreadPoolExecutor
 import os.path
-from oauth_hook import OAuthHook
+import time
+
 import requests
+import requests.adapters
+
+from deskapi.cache import CachedResponse
+from deskapi.codec import (
+    PageStream,
+    default_codec,
+)
+from deskapi.export import export
+from deskapi.metrics import (
+    RequestEvent,
+    endpoint_template,
+)
+from deskapi.six import (
+    parse_qsl,
+    string_types,
+    urlencode,
+    urlsplit,
+    urlunsplit,
+)
+
+
+def _names(value):
+    """Return a list of names given as a list or a comma separated string."""
+
+    if isinstance(value, string_types):
+        return value.split(',')
+
+    return list(value)
+
+
+def _concurrent_map(func, args, max_workers=None):
+    """Return [func(arg) for arg in args].
+
+    If max_workers is set the calls are made by a thread pool of that size.
+    """
+
+    if not max_workers or len(args) < 2:
+        return [func(arg) for arg in args]
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        return list(executor.map(func, args))
+    finally:
+        executor.shutdown(wait=False)
+
+
+def save_all(objects, max_workers=None):
+    """Save the changed fields of each of objects.
+
+    Objects without changes are skipped. The PATCH requests are sent by up
+    to max_workers threads. Returns a (saved, errors) pair: the refreshed
+    objects returned by the successful saves, and (object, exception)
+    pairs for the saves that failed.
+    """
+
+    def save(obj):
+        try:
+            return obj.save(), None
+        except (DeskError, requests.RequestException) as e:
+            return None, e
+
+    changed = [obj for obj in objects if obj._changed]
+    saved = []
+    errors = []
+
+    for obj, (result, error) in zip(
+            changed, _concurrent_map(save, changed, max_workers)):
+        if error is None:
+            saved.append(result)
+        else:
+            errors.append((obj, error))
+
+    return saved, errors
+
+
+def load_translations(objects, locales=None, max_workers=None, fields=None):
+    """Fetch the translations of each of objects.
+
+    The translation lists are requested by up to max_workers threads and
+    memoized on their objects, unless only the given fields are fetched.
+    Returns a dict mapping each object's id to a dict of its translations
+    keyed by locale, limited to locales if given. Objects without
+    translations map to an empty dict.
+    """
+
+    if locales is not None:
+        locales = set(locales)
+
+    def load(obj):
+        if not obj._links.get('translations'):
+            return {}
+
+        translations = obj.translations
+        if fields:
+            translations = translations.filter(fields=fields)
+
+        return dict(
+            (locale, translation)
+            for locale, translation in translations.items().items()
+            if locales is None or locale in locales
+        )
+
+    objects = list(objects)
+
+    return dict(
+        (obj.id, translations)
+        for obj, translations in zip(
+            objects, _concurrent_map(load, objects, max_workers))
+    )
+
 
 class DeskError(Exception):
-    def __init__(self, status):
+    def __init__(self, status, response=None, attempts=1, elapsed=None):
         Exception.__init__(self, status)  # Exception is an old-school class
         self.status = status
+        self.response = response
+        self.attempts = attempts
+        self.elapsed = elapsed
 
     def __str__(self):
         return self.status
@@ -15,61 +129,377 @@ class DeskError(Exception):
         return unicode(self.__str__())
 
 
+class DeskContext(object):
+    """Connection state shared by a session and everything spawned from it.
+
+    Collections and objects hold a reference to their session's context
+    rather than copies of its settings.
+    """
+
+    __slots__ = (
+        'sitename',
+        'base_url',
+        'session',
+        'response_cache',
+        'rate_limiter',
+        'retry',
+        'circuit_breaker',
+        'codec',
+        'identity_map',
+        'hooks',
+    )
+
+    def __init__(self, sitename, session=None, response_cache=None,
+                 rate_limiter=None, retry=None, circuit_breaker=None,
+                 codec=None, identity_map=None, hooks=None, base_url=None):
+
+        self.sitename = sitename
+        self.base_url = base_url or 'https://%s.desk.com' % (sitename, )
+        self.session = session
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.circuit_breaker = circuit_breaker
+        self.codec = codec or default_codec()
+        self.identity_map = identity_map
+        self.hooks = tuple(hooks or ())
+
+
 class DeskSession(object):
 
+    __slots__ = ('_context',)
+
     _CLASSES = {}
     _COLLECTIONS = {}
 
-    def __init__(self, sitename, access_token, access_token_secret, consumer_key, consumer_secret):
-        self._access_token = access_token
-        self._access_token_secret = access_token_secret
-        self._consumer_key = consumer_key
-        self._consumer_secret = consumer_secret
-
-        self._sitename = sitename
-        self._BASE_URL = 'https://%s.desk.com' % (sitename, )
-
-        self.auth_info = {
-            'sitename': self._sitename,
-            'access_token': self._access_token,
-            'access_token_secret': self._access_token_secret,
-            'consumer_key': self._consumer_key,
-            'consumer_secret': self._consumer_secret,
+    DEFAULT_POOL_SIZE = 10
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, sitename=None, auth=None, session=None, pool_size=None,
+                 response_cache=None, rate_limiter=None, retry=None,
+                 circuit_breaker=None, codec=None, identity_map=None,
+                 hooks=None, base_url=None, cassette=None, context=None):
+
+        if context is None:
+            if sitename is None:
+                raise TypeError('DeskSession requires a sitename')
+
+            context = DeskContext(
+                sitename,
+                response_cache=response_cache,
+                rate_limiter=rate_limiter,
+                retry=retry,
+                circuit_breaker=circuit_breaker,
+                codec=codec,
+                identity_map=identity_map,
+                hooks=hooks,
+                base_url=base_url,
+            )
+            self._context = context
+
+            if session is None:
+                session = self._create_session(auth, pool_size, cassette)
+            context.session = session
+
+        self._context = context
+
+    _sitename = property(lambda self: self._context.sitename)
+    _BASE_URL = property(lambda self: self._context.base_url)
+    _session = property(lambda self: self._context.session)
+    _response_cache = property(lambda self: self._context.response_cache)
+    _rate_limiter = property(lambda self: self._context.rate_limiter)
+    _retry = property(lambda self: self._context.retry)
+    _circuit_breaker = property(lambda self: self._context.circuit_breaker)
+    _codec = property(lambda self: self._context.codec)
+    _identity_map = property(lambda self: self._context.identity_map)
+    _hooks = property(lambda self: self._context.hooks)
+
+    def _create_session(self, auth, pool_size=None, cassette=None):
+        """Return a new requests Session with a keep-alive pool for the site.
+
+        The Session is created once and shared by every collection and
+        object spawned from this one, so connections are reused across
+        page fetches, lookups and updates. With a cassette, the site's
+        traffic is recorded or replayed by the cassette's adapter.
+        """
+
+        if pool_size is None:
+            pool_size = self.DEFAULT_POOL_SIZE
+
+        adapter_kwargs = {
+            'pool_connections': 1,
+            'pool_maxsize': pool_size,
         }
 
-    def request(self, path, method='GET', params=None, data=None):
+        session = requests.Session()
+        session.auth = auth
+        session.headers.update({
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+        })
+        session.mount(
+            self._BASE_URL,
+            cassette.adapter(**adapter_kwargs) if cassette is not None
+            else requests.adapters.HTTPAdapter(**adapter_kwargs),
+        )
+
+        return session
+
+    def _api_path(self, path):
+        """Return path relative to the site root."""
 
         if path[0] != '/':
             path = '/api/v2/%s' % (path,)
 
-        request_kwargs = {}
+        return path
 
-        ## --- Someday we may want to do GETs with params; when we do,
-        ## --- this may be helpful
+    def _url(self, path, params=None):
+        """Return the absolute URL for an API path and query params."""
 
-        ## if params:
-        ##     request_kwargs['params'] = params
+        url = '%s%s' % (self._BASE_URL, self._api_path(path),)
 
-        if data:
-            request_kwargs['data'] = data
+        if params:
+            url = '%s%s%s' % (
+                url,
+                '&' if '?' in url else '?',
+                urlencode(self._query_params(params)),
+            )
 
-        url = '%s%s' % (self._BASE_URL, path,)
+        return url
 
-        request = requests.Request(method.upper(), url, data=json.dumps(request_kwargs))
-        oauth_hook = OAuthHook(self._access_token, self._access_token_secret, self._consumer_key,
-                               self._consumer_secret, header_auth=True)
-        request = oauth_hook(request)
-        session = requests.session()
-        session.headers.update({
-            'Accept': 'application/json',
-            'Content-Type': 'application/json',
-        })
-        r = session.send(request.prepare())
+    def _query_params(self, params):
+        """Return params as a list of query string pairs.
+
+        Lists are joined with commas and booleans are lower-cased, as the
+        Desk API expects.
+        """
+
+        query = []
+        for key, value in sorted(params.items()):
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = str(value).lower()
+            elif isinstance(value, (list, tuple)):
+                value = ','.join(str(v) for v in value)
+            query.append((key, value))
+
+        return query
+
+    def _encode(self, data):
+        """Return data encoded as a request body.
+
+        Strings are assumed to be encoded already.
+        """
+
+        if data is None or isinstance(data, (string_types, bytes)):
+            return data
+
+        return self._codec.dumps(data)
+
+    def request(self, path, method='GET', params=None, data=None,
+                stream=False, page=None):
+        """Send a request to the API and return the decoded response.
+
+        data may be a dict, which is encoded once with the session's codec.
+        If stream is True, a PageStream parsing the response body as it
+        arrives is returned instead; streamed responses are not cached.
+        page is the collection page requested, reported to hooks.
+        """
+
+        method = method.upper()
+        url = self._url(path, params)
+        request_kwargs = {}
+
+        if data:
+            request_kwargs['data'] = self._encode(data)
+
+        if stream:
+            request_kwargs['stream'] = True
+
+        cached = None
+        if (self._response_cache is not None and method == 'GET' and
+                not stream):
+            cached = self._response_cache.get(url)
+            if cached is not None:
+                request_kwargs['headers'] = self._conditional_headers(cached)
+
+        start = time.time()
+        try:
+            r, attempts, elapsed = self._send(method, url, **request_kwargs)
+        except (DeskError, requests.RequestException) as e:
+            if self._hooks:
+                self._notify(
+                    method, url, None, time.time() - start,
+                    request_kwargs.get('data'), None,
+                    getattr(e, 'attempts', None), page,
+                )
+            raise
+
+        if self._hooks:
+            self._notify(
+                method, url, r.status_code, elapsed,
+                request_kwargs.get('data'),
+                r.headers.get('Content-Length') if stream else len(r.content),
+                attempts, page,
+            )
+
+        if r.status_code == 304 and cached is not None:
+            return self._codec.loads(cached.content)
 
         if r.status_code >= 400:
-            raise DeskError(str(r.status_code))
-        return json.loads(r.content)
+            raise DeskError(
+                str(r.status_code),
+                response=r,
+                attempts=attempts,
+                elapsed=elapsed,
+            )
+
+        if stream:
+            return PageStream(r.iter_content(self.STREAM_CHUNK_SIZE))
+
+        if self._response_cache is not None and method == 'GET':
+            self._cache_response(url, r)
+
+        return self._codec.loads(r.content)
+
+    def _notify(self, method, url, status, elapsed, body, response_bytes,
+                attempts, page):
+        """Call the session's hooks with a RequestEvent."""
+
+        event = RequestEvent(
+            method=method,
+            url=url,
+            endpoint=endpoint_template(url),
+            status=status,
+            elapsed=elapsed,
+            request_bytes=len(body) if body else 0,
+            response_bytes=(
+                None if response_bytes is None else int(response_bytes)
+            ),
+            attempts=attempts,
+            source=self,
+            page=page,
+        )
 
+        for hook in self._hooks:
+            hook(event)
+
+    def _send(self, method, url, **request_kwargs):
+        """Send a request, returning (response, attempts, elapsed seconds).
+
+        The request goes through the rate limiter, retry policy and circuit
+        breaker, when the session has them. Responses with status 429 pause
+        the rate limiter and are retried; server and connection errors are
+        retried according to the retry policy. A connection error left
+        after the retries is raised as a DeskError with status
+        'connection error'.
+        """
+
+        limiter = self._rate_limiter
+        retry = self._retry
+        breaker = self._circuit_breaker
+
+        start = time.time()
+        attempts = failures = limited = 0
+
+        while True:
+            if breaker is not None and not breaker.allow():
+                raise DeskError(
+                    'circuit open',
+                    attempts=attempts,
+                    elapsed=time.time() - start,
+                )
+
+            attempts += 1
+            settled = breaker is None
+            try:
+                if limiter is not None:
+                    limiter.acquire()
+
+                try:
+                    r = self._session.request(method, url, **request_kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if breaker is not None:
+                        breaker.record_failure()
+                        settled = True
+                    failures += 1
+                    if retry is None or not retry.should_retry(method, failures):
+                        error = DeskError(
+                            'connection error',
+                            attempts=attempts,
+                            elapsed=time.time() - start,
+                        )
+                        error.__cause__ = e
+                        raise error
+                    retry.wait(failures)
+                    continue
+
+                if breaker is not None:
+                    if r.status_code >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    settled = True
+
+                if limiter is not None:
+                    limiter.update(r.headers)
+                    if r.status_code == 429 and limited < limiter.max_retries:
+                        limited += 1
+                        limiter.pause(limiter.retry_after(r.headers))
+                        continue
+
+                if (retry is not None and r.status_code in retry.statuses and
+                        retry.should_retry(method, failures + 1)):
+                    failures += 1
+                    retry.wait(failures)
+                    continue
+
+                return r, attempts, time.time() - start
+            finally:
+                # A half-open breaker lets one trial through; end it even
+                # if the attempt failed in a way it does not count.
+                if not settled:
+                    breaker.release()
+
+    def _conditional_headers(self, cached):
+        """Return the headers revalidating a cached response."""
+
+        headers = {}
+        if cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+
+        return headers
+
+    def _cache_response(self, url, response):
+        """Store response in the response cache if it has validators."""
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+
+        if etag or last_modified:
+            self._response_cache.set(url, CachedResponse(
+                content=response.content,
+                etag=etag,
+                last_modified=last_modified,
+            ))
+
+    def _session_kwargs(self):
+        """Return the kwargs needed to share this session with a child."""
+
+        return {
+            'context': self._context,
+        }
+
+    def batch(self, max_size=None):
+        """Return a DeskBatch sending operations through the batch endpoint.
+
+        Used as a context manager, the batch is sent on exit.
+        """
+
+        return DeskBatch(self, max_size=max_size)
 
     @classmethod
     def register_class(cls, name):
@@ -90,15 +520,36 @@ class DeskSession(object):
         return wrapper
 
     def object(self, entry, *args, **kwargs):
-        """Return a DeskObject for the given entry."""
+        """Return a DeskObject for the given entry.
 
-        object_class = self._CLASSES.get(
-            entry.get('_links', {}).get('self', {}).get('class'),
-            DeskObject,
-        )
-        kwargs.update(**self.auth_info)
+        With an identity map, an object already mapped to the entry's
+        api_href is refreshed with the entry and returned instead.
+        """
+
+        self_link = entry.get('_links', {}).get('self', {})
+        identity_map = self._identity_map
+        api_href = self_link.get('href') if identity_map is not None else None
+
+        if api_href:
+            obj = identity_map.get(api_href)
+            if obj is not None:
+                obj._refresh(entry, kwargs.get('fields'))
+                identity_map.add(obj)
+                return obj
+
+        object_class = self._object_class(self_link.get('class'))
+        kwargs.update(**self._session_kwargs())
+        obj = object_class(entry, *args, **kwargs)
 
-        return object_class(entry, *args, **kwargs)
+        if api_href:
+            identity_map.add(obj)
+
+        return obj
+
+    def _object_class(self, name):
+        """Return the class registered for objects of class name."""
+
+        return self._CLASSES.get(name, DeskObject)
 
     def collection(self, link_info, *args, **kwargs):
         """Return a DeskCollection for the link_info."""
@@ -108,113 +559,593 @@ class DeskSession(object):
             DeskCollection,
         )
 
-        kwargs.update(**self.auth_info)
+        kwargs.update(**self._session_kwargs())
 
         return object_class(link_info['href'], *args, **kwargs)
 
 
 class DeskApi2(DeskSession):
 
-    def topics(self):
+    def topics(self, **kwargs):
 
         return self.collection({
             'class': 'topic',
             'href': 'topics',
-        })
+        }, **kwargs)
 
-    def articles(self):
+    def articles(self, **kwargs):
 
         return self.collection({
             'class': 'article',
             'href': 'articles',
-        })
+        }, **kwargs)
+
+    def export(self, path, **kwargs):
+        """Export the site to JSON lines files; see deskapi.export."""
+
+        return export(self, path, **kwargs)
 
 
 class DeskCollection(DeskSession):
 
-    def __init__(self, path, **kwargs):
+    def __init__(self, path, page_workers=None, per_page=None, params=None,
+                 stream=False, embed=None, fields=None, **kwargs):
+        """Create a collection for the API path.
+
+        Pages are cached sparsely by page number as they are fetched. If
+        per_page is given it is sent to the API; otherwise the page size is
+        taken from the first page. If page_workers is set, pages needed at
+        the same time are fetched concurrently by that many threads. params
+        are sent as query parameters with every page request. If stream is
+        True, page entries are parsed one at a time as the response arrives.
+        embed names linked resources (such as 'topic') which Desk should
+        embed in each item, and fields limits items to the named fields,
+        for pages and by_id alike.
+        """
+
+        super(DeskCollection, self).__init__(**kwargs)
+
+        params = dict(params or {})
+        if embed:
+            params['embed'] = embed
+        if fields:
+            params['fields'] = fields
+
+        if params:
+            # Params replace any of the same name already in the path.
+            scheme, netloc, path, query, fragment = urlsplit(path)
+            query = [
+                (key, value)
+                for key, value in parse_qsl(query)
+                if key not in params
+            ]
+            query.extend(self._query_params(params))
+            path = urlunsplit((scheme, netloc, path, urlencode(query), fragment))
 
         self._path = path
+        self._page_workers = page_workers
+        self._stream = stream
+        self._embed = embed
+        self._fields = fields
+        self._per_page = per_page
+        self._page_template = None
+        if per_page:
+            self._page_template = self._href_template(path, per_page=per_page)
+        self._page_map = {}
+        self._next_hrefs = {}
+        self._total_entries = None
         self._cache = None
+        self._index = {}
         self._links = None
 
-        super(DeskCollection, self).__init__(**kwargs)
-
     def items(self):
 
-        # XXX support partial/incremental cache filling
         if self._cache is None:
-            self._cache = self._fill_cache()
+            self._cache = [
+                item
+                for items in self._iter_pages()
+                for item in items
+            ]
 
         return self._cache
 
-    def _fill_cache(self):
+    def __iter__(self):
 
-        items = []
-        page_response = self.request(self._path)
-        if self._links is None and page_response.get('_links'):
-            self._links = page_response.get('_links')
+        for items in self._iter_pages():
+            for item in items:
+                yield item
 
-        while page_response and page_response.get('_embedded', {}).get('entries'):
+    def _href_template(self, href, **params):
+        """Return a template for building page hrefs from href."""
 
-            for entry in page_response['_embedded']['entries']:
-                items.append(
-                    self.object(entry)
-                )
+        scheme, netloc, path, query, fragment = urlsplit(href)
+        query = [
+            (key, value)
+            for key, value in parse_qsl(query)
+            if key != 'page' and key not in params
+        ]
+        query.extend(sorted(params.items()))
 
-            if page_response.get('_links', {}).get('next'):
-                page_response = self.request(
-                    page_response['_links']['next']['href']
-                )
-            else:
-                page_response = None
+        return (scheme, netloc, path, query, fragment)
+
+    def _page_href(self, page):
+        """Return the href of a page, computed from the page template."""
+
+        scheme, netloc, path, query, fragment = self._page_template
+
+        return urlunsplit((
+            scheme, netloc, path,
+            urlencode(query + [('page', page)]),
+            fragment,
+        ))
+
+    def _num_pages(self):
+        """Return the number of pages, or None if it is not known yet."""
+
+        if self._page_template is not None and self._total_entries is not None:
+            return max(1, -(-self._total_entries // self._per_page))
+
+        if 1 in self._page_map and not self._next_hrefs[1]:
+            return 1
+
+        return None
+
+    def _request_page(self, href, page):
+
+        return self.request(href, stream=self._stream, page=page)
+
+    def _store_page(self, page, page_response):
+        """Wrap and cache the entries of a page response or PageStream."""
+
+        if isinstance(page_response, PageStream):
+            entries = page_response
+        else:
+            entries = page_response.get('_embedded', {}).get('entries') or []
+
+        items = [self.object(entry, fields=self._fields) for entry in entries]
+
+        if isinstance(page_response, PageStream):
+            page_response = page_response.page
+
+        links = page_response.get('_links') or {}
+        if self._links is None and links:
+            self._links = links
+        if self._total_entries is None:
+            self._total_entries = page_response.get('total_entries')
+
+        next_link = links.get('next')
+        self._next_hrefs[page] = next_link['href'] if next_link and items else None
+
+        if page == 1 and self._page_template is None and next_link:
+            # Page arithmetic needs a page parameter to substitute and a
+            # total to count pages against; otherwise follow next links.
+            # Pages are built from the collection's own query, which the
+            # next link may not echo, taking only per_page from the link.
+            next_query = dict(parse_qsl(urlsplit(next_link['href'])[3]))
+            if 'page' in next_query and self._total_entries is not None:
+                self._per_page = int(next_query.get('per_page', len(items)))
+                if 'per_page' in next_query:
+                    self._page_template = self._href_template(
+                        self._path, per_page=next_query['per_page'],
+                    )
+                else:
+                    self._page_template = self._href_template(self._path)
+
+        self._page_map[page] = items
+        for item in self._page_map[page]:
+            self._index_item(item)
+
+        return self._page_map[page]
+
+    def _index_key(self, key):
+        """Return the id index key for an object, api_href or id."""
+
+        if isinstance(key, DeskObject):
+            return key._links.get('self', {}).get('href')
+
+        if isinstance(key, string_types) and key.isdigit():
+            return int(key)
 
-        return items
+        return key
+
+    def _index_item(self, item):
+        """Add an item to the id index under its api_href and id."""
+
+        href = item._links.get('self', {}).get('href')
+        if not href:
+            return
+
+        self._index[href] = item
+
+        last_segment = href.rsplit('/', 1)[-1]
+        if last_segment.isdigit():
+            self._index[int(last_segment)] = item
+
+    def _load_page(self, page):
+        """Return the items on page, fetching it if needed.
+
+        Pages past the end of the collection are empty.
+        """
+
+        if self._page_template is None and not self._page_map:
+            self._store_page(1, self._request_page(self._path, 1))
+
+        if page in self._page_map:
+            return self._page_map[page]
+
+        if self._page_template is not None:
+            num_pages = self._num_pages()
+            if num_pages is None or page <= num_pages:
+                return self._store_page(
+                    page,
+                    self._request_page(self._page_href(page), page),
+                )
+        else:
+            # Without page arithmetic, pages are loaded in order by
+            # following each page's next link.
+            last = max(self._page_map)
+            while last < page and self._next_hrefs[last]:
+                self._store_page(
+                    last + 1,
+                    self._request_page(self._next_hrefs[last], last + 1),
+                )
+                last += 1
+
+        return self._page_map.get(page, [])
+
+    def _load_pages(self, pages):
+        """Fetch whichever of pages are not cached yet."""
+
+        fetched = self._fetch_pages([
+            page for page in pages
+            if page not in self._page_map
+        ])
+
+        for page, page_response in fetched:
+            if page not in self._page_map:
+                self._store_page(page, page_response)
+
+    def _iter_pages(self):
+        """Yield the items of each page in order, fetching as needed."""
+
+        items = self._load_page(1)
+        num_pages = self._num_pages()
+
+        if num_pages is None:
+            page = 1
+            while items:
+                yield items
+                page += 1
+                items = self._load_page(page)
+            return
+
+        yield items
+
+        pages = range(2, num_pages + 1)
+        fetched = self._fetch_pages([
+            page for page in pages
+            if page not in self._page_map
+        ])
+        try:
+            for page in pages:
+                while page not in self._page_map:
+                    fetched_page, page_response = next(fetched)
+                    if fetched_page not in self._page_map:
+                        self._store_page(fetched_page, page_response)
+
+                yield self._page_map[page]
+        finally:
+            fetched.close()
+
+    def _fetch_pages(self, pages):
+        """Yield (page, response) for pages in order.
+
+        Pages are requested lazily one at a time, or all at once by a
+        bounded thread pool if page_workers is set.
+        """
+
+        if not self._page_workers or len(pages) < 2:
+            for page in pages:
+                yield page, self._request_page(self._page_href(page), page)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=self._page_workers)
+        futures = [
+            (page, executor.submit(
+                self._request_page, self._page_href(page), page))
+            for page in pages
+        ]
+
+        try:
+            for page, future in futures:
+                yield page, future.result()
+        finally:
+            for page, future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
 
     def __len__(self):
 
-        return len(self.items())
+        if self._total_entries is None and not self._page_map:
+            self._load_page(1)
+
+        if self._total_entries is None:
+            return len(self.items())
+
+        return self._total_entries
+
+    def _create_kwargs(self, kwargs):
+        """Return the fields to send when creating a new item."""
+
+        return kwargs
+
+    def bulk_create(self, items, max_size=None):
+        """Create an item for each dict of fields in items.
+
+        The creates are sent through the batch endpoint. Returns a list
+        holding the new DeskObject, or a DeskError, for each item.
+        """
+
+        with self.batch(max_size=max_size) as batch:
+            for fields in items:
+                batch.create(self, **fields)
+
+        return batch.results
+
+    def bulk_update(self, objects, max_size=None):
+        """Save the changed fields of each of objects.
+
+        The updates are sent through the batch endpoint; objects without
+        changes are skipped. Returns a list holding the updated
+        DeskObject, or a DeskError, for each object saved.
+        """
+
+        with self.batch(max_size=max_size) as batch:
+            for obj in objects:
+                if obj._changed:
+                    batch.update(obj, **obj._changed)
+
+        return batch.results
 
     def create(self, **kwargs):
         """Create a new item in the Collection and return it."""
 
         return self.object(
             self.request(
-                self._path,
+                self._items_path(),
                 method='POST',
-                data=json.dumps(kwargs),
+                data=self._create_kwargs(kwargs),
             )
         )
 
     def __getitem__(self, n):
 
-        return self.items()[n]
+        if isinstance(n, slice):
+            indices = range(*n.indices(len(self)))
+            if self._page_template is None:
+                return self.items()[n]
+
+            self._load_pages(sorted(set(
+                index // self._per_page + 1
+                for index in indices
+            )))
+            return [self._item(index) for index in indices]
+
+        if n < 0:
+            n += len(self)
+
+        return self._item(n)
+
+    def _item(self, n):
+        """Return the nth item, fetching only the page that holds it."""
+
+        if n < 0:
+            raise IndexError('collection index out of range')
+
+        if self._page_template is None:
+            self._load_page(1)
+
+        if self._page_template is None:
+            for index, item in enumerate(self):
+                if index == n:
+                    return item
+            raise IndexError('collection index out of range')
+
+        page, offset = divmod(n, self._per_page)
+        items = self._load_page(page + 1)
+        if offset >= len(items):
+            raise IndexError('collection index out of range')
+
+        return items[offset]
+
+    def _derived(self, path, params, **kwargs):
+        """Return a new collection of this type for path and params.
+
+        embed and fields may be given in params to replace this
+        collection's.
+        """
+
+        kwargs.setdefault('page_workers', self._page_workers)
+        kwargs.setdefault('per_page', params.pop('per_page', self._per_page))
+        kwargs.setdefault('stream', self._stream)
+        kwargs.setdefault('embed', params.pop('embed', self._embed))
+        kwargs.setdefault('fields', params.pop('fields', self._fields))
+        kwargs.update(**self._session_kwargs())
+
+        return type(self)(path, params=params, **kwargs)
+
+    def filter(self, **params):
+        """Return this collection narrowed by server-side query params."""
+
+        return self._derived(self._path, params)
+
+    def search(self, **params):
+        """Return the results of the collection's search endpoint.
+
+        For articles, Desk accepts params such as text, topic_ids and
+        in_support_center. Results are paginated lazily like any other
+        collection.
+        """
+
+        scheme, netloc, path, query, fragment = urlsplit(self._path)
+
+        return self._derived(
+            urlunsplit((scheme, netloc, '%s/search' % (path,), query, fragment)),
+            params,
+        )
 
     def __contains__(self, key):
 
-        return key in self.items()
+        key = self._index_key(key)
 
-    def by_id(self, id):
-        """Return an item of this collection based on its ID."""
+        if key in self._index:
+            return True
 
-        return self.object(
-            self.request(
-                '%s/%s' % (self._path, id),
-                method='GET',
-            )
+        for items in self._iter_pages():
+            if key in self._index:
+                return True
+
+        return False
+
+    def _items_path(self):
+        """Return the path items of this collection are created under.
+
+        Search results live under the searched collection's path.
+        """
+
+        path = urlsplit(self._path)[2]
+        if path.endswith('/search'):
+            path = path[:-len('/search')]
+
+        return path
+
+    def _item_params(self, embed=None, fields=None):
+        """Return the query params for fetching one item, or None.
+
+        embed and fields default to the collection's.
+        """
+
+        params = {}
+        if embed or self._embed:
+            params['embed'] = embed or self._embed
+        if fields or self._fields:
+            params['fields'] = fields or self._fields
+
+        return params or None
+
+    def _mapped(self, id):
+        """Return the identity mapped object for id, or None."""
+
+        if self._identity_map is None:
+            return None
+
+        return self._identity_map.get(
+            self._api_path('%s/%s' % (self._items_path(), id)),
         )
 
+    def _loaded(self, id):
+        """Return the item for id loaded by this collection or the map.
+
+        With an identity map, items it no longer holds fresh are not
+        returned, even if this collection loaded them.
+        """
+
+        item = self._index.get(self._index_key(id))
+        if self._identity_map is None:
+            return item
+        if item is not None:
+            return self._identity_map.get(item.api_href)
+
+        return self._mapped(id)
+
+    def by_id(self, id, embed=None, fields=None):
+        """Return an item of this collection based on its ID.
+
+        embed and fields default to the collection's. Items already loaded
+        by this collection, or held by the session's identity map, are
+        returned without a request, unless they lack a resource named in
+        embed or one of the fields. With an identity map, items are only
+        reused while the map holds them fresh.
+        """
+
+        params = self._item_params(embed, fields)
+        item = self._loaded(id)
+        if item is not None:
+            self._index_item(item)
+
+        if item is None or not item._satisfies(params):
+            item = self.object(
+                self.request(
+                    '%s/%s' % (self._items_path(), id),
+                    method='GET',
+                    params=params,
+                ),
+                fields=(params or {}).get('fields'),
+            )
+            self._index_item(item)
+
+        return item
+
+    def get_many(self, ids):
+        """Return the items for ids, in order.
+
+        Only items not already loaded are requested, concurrently if
+        page_workers is set.
+        """
+
+        items = {}
+        missing = {}
+        for id in ids:
+            key = self._index_key(id)
+            if key not in items:
+                items[key] = self._loaded(id)
+                if items[key] is None:
+                    missing[key] = id
+
+        items.update(zip(missing, _concurrent_map(
+            self.by_id, list(missing.values()), self._page_workers,
+        )))
+
+        return [items[self._index_key(id)] for id in ids]
+
 
 class DeskObject(DeskSession):
 
-    def __init__(self, entry, **kwargs):
+    # Objects hold only their entry, any changes made to it, the fields
+    # fetched if not all were, their translations once fetched and a
+    # reference to the shared DeskContext.
+    __slots__ = ('_entry', '_changes', '_fields', '_translations')
+
+    def __init__(self, entry, fields=None, **kwargs):
+        """Wrap entry; fields names the fields fetched, if not all were."""
 
         self._entry = entry
-        self._links = entry['_links']
-        self._changed = {}
+        self._changes = None
+        self._fields = frozenset(_names(fields)) if fields else None
+        self._translations = None
 
         super(DeskObject, self).__init__(**kwargs)
 
+    @property
+    def _links(self):
+
+        return self._entry['_links']
+
+    @property
+    def _changed(self):
+        """Return the fields assigned since this object was fetched."""
+
+        if self._changes is None:
+            return {}
+
+        return self._changes
+
+    @property
+    def partial(self):
+        """Return True if only some of the object's fields were fetched."""
+
+        return self._fields is not None
+
     @property
     def api_href(self):
         """Return the API href for this object."""
@@ -227,33 +1158,125 @@ class DeskObject(DeskSession):
         return self.update(**self._changed)
 
     def update(self, **kwargs):
-        """Update this Desk object with kwargs, returning an updated version."""
+        """Update this Desk object with kwargs, returning an updated version.
+
+        With an identity map the updated version is this object, refreshed.
+        """
 
         response = self.request(
             self.api_href,
             method='patch',
-            data=json.dumps(kwargs),
+            data=kwargs,
         )
 
+        self._saved(kwargs)
+
         return self.object(response)
 
+    def _saved(self, fields):
+        """Forget the changes to fields once saved to a mapped object."""
+
+        if self._identity_map is not None and self._changes:
+            for key in fields:
+                self._changes.pop(key, None)
+
+    def _refresh(self, entry, fields=None):
+        """Replace the entry, keeping unsaved changes.
+
+        An entry holding only fields is merged into the current one.
+        """
+
+        if fields:
+            entry = dict(self._entry, **entry)
+            if self._fields is not None:
+                self._fields = self._fields.union(_names(fields))
+        else:
+            self._fields = None
+
+        if self._changes:
+            entry.update(self._changes)
+
+        self._entry = entry
+
+    def _load_fields(self, key):
+        """Fetch all the fields of a partial object which lacks key."""
+
+        self._refresh(self.request(self.api_href))
+
+    def _wrap_embedded(self, value):
+
+        if isinstance(value, list):
+            return [self._wrap_embedded(entry) for entry in value]
+        if isinstance(value, dict):
+            return self.object(value)
+
+        return value
+
+    def _satisfies(self, params):
+        """Return True if this object holds what the item params request."""
+
+        params = params or {}
+        embedded = self._entry.get('_embedded') or {}
+
+        if any(name not in embedded for name in _names(params.get('embed', ()))):
+            return False
+        if self._fields is None:
+            return True
+
+        return self._fields.issuperset(_names(params.get('fields', ())))
+
     def __getattr__(self, key):
 
+        # Special and unset slot attributes are not fields.
+        if key.startswith('__') or key in DeskObject.__slots__:
+            raise AttributeError(key)
+
+        try:
+            return self._entry[key]
+        except KeyError:
+            # Resources embedded by Desk are reached by their link name.
+            embedded = self._entry.get('_embedded') or {}
+            if key in embedded:
+                return self._wrap_embedded(embedded[key])
+            if self._fields is None:
+                raise
+
+        # Fields left out of a partial object are fetched on first use.
+        self._load_fields(key)
+
         return self._entry[key]
 
     def __setattr__(self, key, value):
 
-        if key in self.__dict__ or key.startswith('_'):
+        if key.startswith('_') or key in getattr(self, '__dict__', ()):
             return super(DeskObject, self).__setattr__(key, value)
 
-        self._entry[key] = self._changed[key] = value
+        if self._changes is None:
+            self._changes = {}
+
+        self._entry[key] = self._changes[key] = value
 
     @property
     def translations(self):
+        """Return the translations collection, created on first access.
 
-        return self.collection(
-            self._links['translations'],
-        )
+        Translations embedded in the entry are used without a request.
+        """
+
+        if self._translations is None:
+            self._translations = self.collection(
+                self._links['translations'],
+            )
+
+            embedded = (self._entry.get('_embedded') or {}).get('translations')
+            if isinstance(embedded, dict):
+                embedded = (embedded.get('_embedded') or {}).get('entries')
+            if embedded is not None:
+                self._translations._locale_cache = dict(
+                    (t.locale, t) for t in self._wrap_embedded(embedded)
+                )
+
+        return self._translations
 
     @property
     def id(self):
@@ -266,10 +1289,122 @@ class DeskObject(DeskSession):
             )
 
 
+class DeskBatch(object):
+    """Operations sent to Desk together through the batch endpoint.
+
+    Operations are packed into batch requests of at most max_size
+    operations each. After send(), results holds a DeskObject or a
+    DeskError for each operation, in the order they were added; if a
+    batch request fails, each of its operations gets that error.
+    """
+
+    MAX_SIZE = 10
+
+    def __init__(self, session, max_size=None):
+
+        self._session = session
+        self.max_size = max_size or self.MAX_SIZE
+        self._operations = []
+        # the object each operation updates, or None for creates
+        self._updated = []
+        self.results = None
+
+    def create(self, collection, **kwargs):
+        """Add creating an item in collection."""
+
+        self._operations.append({
+            'method': 'POST',
+            'url': collection._api_path(collection._items_path()),
+            'body': collection._create_kwargs(kwargs),
+        })
+        self._updated.append(None)
+
+    def update(self, obj, **kwargs):
+        """Add updating obj with kwargs.
+
+        Like DeskObject.update(), a successful update clears the saved
+        changes of an identity-mapped obj.
+        """
+
+        self._operations.append({
+            'method': 'PATCH',
+            'url': obj._api_path(obj.api_href),
+            'body': kwargs,
+        })
+        self._updated.append(obj)
+
+    def send(self):
+        """Send the queued operations, returning their results."""
+
+        results = []
+        operations = self._operations
+
+        for start in range(0, len(operations), self.max_size):
+            chunk = operations[start:start + self.max_size]
+            try:
+                response = self._session.request(
+                    'batch',
+                    method='POST',
+                    data={
+                        'requests': dict(
+                            (str(index), operation)
+                            for index, operation in enumerate(chunk)
+                        ),
+                    },
+                )
+            except (DeskError, requests.RequestException) as e:
+                # Earlier chunks were applied; keep their results and
+                # report the failure for this chunk's operations only.
+                error = e
+                if not isinstance(e, DeskError):
+                    error = DeskError('connection error')
+                    error.__cause__ = e
+                results.extend([error] * len(chunk))
+                continue
+
+            responses = response.get('responses', {})
+            for index, operation in enumerate(chunk):
+                result = self._result(responses.get(str(index)))
+                obj = self._updated[start + index]
+                if obj is not None and not isinstance(result, DeskError):
+                    obj._saved(operation['body'])
+                results.append(result)
+
+        self._operations = []
+        self._updated = []
+        self.results = results
+
+        return results
+
+    def _result(self, response):
+        """Return the DeskObject or DeskError for one batch response."""
+
+        if response is None:
+            return DeskError('missing')
+
+        if response.get('status', 200) >= 400:
+            return DeskError(str(response['status']))
+
+        return self._session.object(response['body'])
+
+    def __len__(self):
+
+        return len(self._operations)
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        if exc_type is None:
+            self.send()
+
+
 @DeskSession.register_class('topic')
 class DeskTopicCollection(DeskCollection):
 
-    def create(self, **kwargs):
+    def _create_kwargs(self, kwargs):
 
         create_kwargs = {
             "name": '',
@@ -279,7 +1414,7 @@ class DeskTopicCollection(DeskCollection):
 
         create_kwargs.update(kwargs)
 
-        return super(DeskTopicCollection, self).create(**create_kwargs)
+        return create_kwargs
 
 
 @DeskSession.register_class('article_translation')
@@ -288,6 +1423,11 @@ class DeskTranslationCollection(DeskCollection):
 
     def __init__(self, *a, **kw):
 
+        # Translations are keyed by locale, so it is always fetched.
+        fields = kw.get('fields')
+        if fields and 'locale' not in _names(fields):
+            kw['fields'] = _names(fields) + ['locale']
+
         super(DeskTranslationCollection, self).__init__(*a, **kw)
 
         self._locale_cache = None
@@ -303,3 +1443,23 @@ class DeskTranslationCollection(DeskCollection):
             ])
 
         return self._locale_cache
+
+    def __iter__(self):
+
+        return iter(self.items())
+
+    def __getitem__(self, locale):
+
+        return self.items()[locale]
+
+    def __contains__(self, locale):
+
+        return locale in self.items()
+
+    def create(self, **kwargs):
+
+        translation = super(DeskTranslationCollection, self).create(**kwargs)
+        if self._locale_cache is not None:
+            self._locale_cache[translation.locale] = translation
+
+        return translation
@@ -0,0 +1,305 @@
+"""Publish articles and translations from local records, sending only changes.
+
+``DeskPublisher.publish()`` takes the desired state of articles as dicts
+of fields, for example as kept in a git repository, and brings the site
+in line with it. Each record is reduced to a stable content hash which
+is compared with the hash of the same fields on the site, or with the
+hash stored in a manifest by an earlier publish. Only records which
+differ are created or updated, through the batch endpoint, and updates
+send just the fields whose values changed.
+"""
+
+import hashlib
+import json
+import os
+
+import requests
+
+from deskapi.models import (
+    DeskError,
+    _concurrent_map,
+)
+
+
+def content_hash(fields):
+    """Return a hash of a dict of fields, independent of their order."""
+
+    return hashlib.sha1(json.dumps(
+        fields, sort_keys=True, separators=(',', ':'),
+    ).encode('utf8')).hexdigest()
+
+
+def changed_fields(obj, fields):
+    """Return the items of fields whose values differ from obj's."""
+
+    return dict(
+        (key, value)
+        for key, value in fields.items()
+        if key not in obj._entry or obj._entry[key] != value
+    )
+
+
+def _content(record):
+    """Return the fields of record which are compared with the site.
+
+    The id, translations and links such as _links are left out.
+    """
+
+    return dict(
+        (key, value)
+        for key, value in record.items()
+        if key not in ('id', 'translations') and not key.startswith('_')
+    )
+
+
+def _counts():
+
+    return {'created': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+
+
+class DeskPublisher(object):
+
+    def __init__(self, api, manifest=None, max_workers=None, batch_size=None):
+        """Create a publisher for the site api.
+
+        manifest is the path of a JSON file of the content hashes last
+        published, read if it exists and rewritten by each publish.
+        Translation lists are fetched by up to max_workers threads, and
+        batch requests hold at most batch_size operations.
+        """
+
+        self._api = api
+        self._manifest_path = manifest
+        self._max_workers = max_workers
+        self._batch_size = batch_size
+
+        self.manifest = {'articles': {}, 'translations': {}}
+        if manifest is not None and os.path.exists(manifest):
+            with open(manifest) as manifest_file:
+                self.manifest = json.load(manifest_file)
+
+    def publish(self, records):
+        """Create or update articles to match records.
+
+        Each record is a dict of article fields. A record with an id is
+        the desired state of that article; one without is created. A
+        record's translations, if any, map locales to dicts of
+        translation fields. Returns a dict counting the articles and the
+        translations created, updated, unchanged and failed, with the
+        failures as (record, locale, DeskError) triples under 'errors';
+        locale is None for articles.
+        """
+
+        records = list(records)
+        result = {
+            'articles': _counts(),
+            'translations': _counts(),
+            'errors': [],
+        }
+
+        ids = self._publish_articles(records, result)
+        self._publish_translations(records, ids, result)
+        self.save_manifest()
+
+        return result
+
+    def _publish_articles(self, records, result):
+        """Publish the article fields of records.
+
+        Returns a list holding each record's article id, or None where
+        the article could not be created.
+        """
+
+        hashes = self.manifest['articles']
+        counts = result['articles']
+        ids = [record.get('id') for record in records]
+
+        stale = [
+            record for record in records
+            if 'id' in record and
+            hashes.get(str(record['id'])) != content_hash(_content(record))
+        ]
+        remote = self._fetch_articles(stale)
+
+        batch = self._api.batch(max_size=self._batch_size)
+        operations = []
+        for index, record in enumerate(records):
+            fields = _content(record)
+
+            if 'id' not in record:
+                batch.create(
+                    self._api.articles(),
+                    **dict((key, value) for key, value in record.items()
+                           if key not in ('id', 'translations'))
+                )
+                operations.append((index, 'created', content_hash(fields)))
+                continue
+
+            if record['id'] not in remote:
+                counts['unchanged'] += 1
+                continue
+
+            obj = remote[record['id']]
+            if isinstance(obj, Exception):
+                counts['failed'] += 1
+                result['errors'].append((record, None, obj))
+                continue
+
+            changes = changed_fields(obj, fields)
+            if not changes:
+                hashes[str(record['id'])] = content_hash(fields)
+                counts['unchanged'] += 1
+                continue
+
+            batch.update(obj, **changes)
+            operations.append((index, 'updated', content_hash(fields)))
+
+        for (index, outcome, fields_hash), response in zip(
+                operations, self._send(batch, len(operations))):
+            if isinstance(response, Exception):
+                counts['failed'] += 1
+                result['errors'].append((records[index], None, response))
+                continue
+
+            ids[index] = response.id
+            hashes[str(response.id)] = fields_hash
+            counts[outcome] += 1
+
+        return ids
+
+    def _fetch_articles(self, records):
+        """Return a dict of the articles of records on the site, by id.
+
+        Only the fields the records hold are fetched. Without hashes in
+        the manifest every article is listed, a page at a time;
+        otherwise the few articles which changed are fetched by id.
+        Articles which could not be fetched map to the error.
+        """
+
+        if not records:
+            return {}
+
+        fields = set()
+        for record in records:
+            fields.update(_content(record))
+        articles = self._api.articles(
+            fields=sorted(fields) or None,
+            page_workers=self._max_workers,
+        )
+        wanted = set(record['id'] for record in records)
+
+        if self.manifest['articles']:
+            def fetch(id):
+                try:
+                    return articles.by_id(id)
+                except (DeskError, requests.RequestException) as e:
+                    return e
+
+            ids = sorted(wanted)
+            remote = dict(zip(
+                ids, _concurrent_map(fetch, ids, self._max_workers),
+            ))
+        else:
+            remote = dict(
+                (obj.id, obj) for obj in articles if obj.id in wanted
+            )
+
+        for id in wanted:
+            remote.setdefault(id, DeskError('404'))
+
+        return remote
+
+    def _publish_translations(self, records, ids, result):
+        """Publish the translations of records, whose article ids are ids."""
+
+        hashes = self.manifest['translations']
+        counts = result['translations']
+
+        stale = []
+        for record, id in zip(records, ids):
+            translations = record.get('translations') or {}
+            if id is None:
+                counts['failed'] += len(translations)
+                continue
+
+            locales = []
+            for locale, fields in sorted(translations.items()):
+                if (hashes.get('%s/%s' % (id, locale)) ==
+                        content_hash(_content(fields))):
+                    counts['unchanged'] += 1
+                else:
+                    locales.append(locale)
+            if locales:
+                stale.append((record, id, locales))
+
+        def load(item):
+            record, id, locales = item
+            collection = self._api.collection({
+                'class': 'article_translation',
+                'href': 'articles/%s/translations' % (id,),
+            })
+            try:
+                collection.items()
+            except (DeskError, requests.RequestException) as e:
+                return collection, e
+            return collection, None
+
+        batch = self._api.batch(max_size=self._batch_size)
+        operations = []
+        for (record, id, locales), (collection, error) in zip(
+                stale, _concurrent_map(load, stale, self._max_workers)):
+            for locale in locales:
+                if error is not None:
+                    counts['failed'] += 1
+                    result['errors'].append((record, locale, error))
+                    continue
+
+                fields = _content(record['translations'][locale])
+                key = '%s/%s' % (id, locale)
+
+                if locale not in collection:
+                    batch.create(collection, locale=locale, **fields)
+                    operations.append((record, locale, key, 'created',
+                                       content_hash(fields)))
+                    continue
+
+                changes = changed_fields(collection[locale], fields)
+                if not changes:
+                    hashes[key] = content_hash(fields)
+                    counts['unchanged'] += 1
+                    continue
+
+                batch.update(collection[locale], **changes)
+                operations.append((record, locale, key, 'updated',
+                                   content_hash(fields)))
+
+        for (record, locale, key, outcome, fields_hash), response in zip(
+                operations, self._send(batch, len(operations))):
+            if isinstance(response, Exception):
+                counts['failed'] += 1
+                result['errors'].append((record, locale, response))
+                continue
+
+            hashes[key] = fields_hash
+            counts[outcome] += 1
+
+    def _send(self, batch, count):
+        """Send batch, returning a result for each of count operations.
+
+        The operations of a batch request which failed have its error as
+        their result.
+        """
+
+        if not count:
+            return []
+
+        return batch.send()
+
+    def save_manifest(self):
+        """Write the manifest, if it has a path."""
+
+        if self._manifest_path is None:
+            return
+
+        with open(self._manifest_path, 'w') as manifest_file:
+            json.dump(self.manifest, manifest_file, indent=2, sort_keys=True)
@@ -0,0 +1,105 @@
+"""Client-side rate limiting for Desk API requests.
+
+A ``RateLimiter`` is passed to ``DeskSession`` as ``rate_limiter`` and is
+shared by every collection and object spawned from that session. Each
+request takes a token from the bucket first; the bucket's size and the
+remaining budget are adjusted from Desk's ``X-Rate-Limit-*`` response
+headers, and a ``429`` response pauses all requests for ``Retry-After``
+seconds before the request is retried.
+"""
+
+import threading
+import time
+
+
+def _int_header(headers, name):
+
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter(object):
+    """A token bucket refilled at limit requests per period seconds."""
+
+    # times a request answered with 429 is retried before failing
+    MAX_RETRIES = 5
+
+    def __init__(self, limit=60, period=60.0, max_retries=None,
+                 clock=time.time, sleep=time.sleep):
+
+        self.limit = limit
+        self.period = period
+        self.max_retries = (
+            self.MAX_RETRIES if max_retries is None else max_retries
+        )
+
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(limit)
+        self._updated = clock()
+        self._paused_until = 0
+
+    def _refill(self, now):
+
+        elapsed = max(now - self._updated, 0)
+        self._tokens = min(
+            self.limit,
+            self._tokens + elapsed * self.limit / self.period,
+        )
+        self._updated = now
+
+    def acquire(self):
+        """Take a token, blocking until one is available."""
+
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) * self.period / self.limit
+
+            self._sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every request for seconds."""
+
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0
+
+    def update(self, headers):
+        """Adjust the budget from a response's rate limit headers."""
+
+        limit = _int_header(headers, 'X-Rate-Limit-Limit')
+        remaining = _int_header(headers, 'X-Rate-Limit-Remaining')
+        reset = _int_header(headers, 'X-Rate-Limit-Reset')
+
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+
+            if limit:
+                self.limit = limit
+            if remaining is not None:
+                self._tokens = min(self._tokens, remaining)
+            if remaining == 0 and reset:
+                self._paused_until = max(self._paused_until, now + reset)
+
+    def retry_after(self, headers):
+        """Return the seconds to wait before retrying a 429 response."""
+
+        for name in ('Retry-After', 'X-Rate-Limit-Reset'):
+            seconds = _int_header(headers, name)
+            if seconds is not None:
+                return max(seconds, 0)
+
+        return 1
@@ -0,0 +1,114 @@
+"""Retries and circuit breaking for Desk API requests.
+
+A ``RetryPolicy`` passed to ``DeskSession`` as ``retry`` retries
+requests which fail with a server error or a connection error, waiting
+an exponentially growing, jittered delay between attempts. Only
+idempotent methods are retried: ``GET`` by default, and ``PATCH`` when
+it is included in ``methods``.
+
+A ``CircuitBreaker`` passed as ``circuit_breaker`` counts consecutive
+failures; once there are ``failure_threshold`` of them requests fail
+immediately for ``reset_timeout`` seconds, after which a single trial
+request is let through.
+"""
+
+import random
+import threading
+import time
+
+
+class RetryPolicy(object):
+
+    def __init__(self, max_retries=3, backoff=0.5, max_backoff=30.0,
+                 methods=('GET',), statuses=(500, 502, 503, 504),
+                 jitter=True, sleep=time.sleep, random=random.random):
+
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.methods = frozenset(method.upper() for method in methods)
+        self.statuses = frozenset(statuses)
+        self.jitter = jitter
+
+        self._sleep = sleep
+        self._random = random
+
+    def should_retry(self, method, failures):
+        """Return True if a request which has failed failures times
+        should be tried again."""
+
+        return method.upper() in self.methods and failures <= self.max_retries
+
+    def delay(self, failures):
+        """Return the seconds to wait after the given number of failures."""
+
+        delay = min(self.max_backoff, self.backoff * 2 ** (failures - 1))
+        if self.jitter:
+            delay *= self._random()
+
+        return delay
+
+    def wait(self, failures):
+
+        self._sleep(self.delay(failures))
+
+
+class CircuitBreaker(object):
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0,
+                 clock=time.time):
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    @property
+    def state(self):
+
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """Return True if a request may be sent now."""
+
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def release(self):
+        """End a trial request without recording its outcome."""
+
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                self._trial = False
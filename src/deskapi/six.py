@@ -2,9 +2,15 @@ import sys
 
 
 if sys.version_info < (3, 0):  # pragma: no cover
-    import unittest2 as unittest
-    from unittest2 import TestCase
-    from urlparse import parse_qs
+    try:
+        import unittest2 as unittest
+    except ImportError:  # only needed to run the tests
+        import unittest
+    TestCase = unittest.TestCase
+    from urllib import quote, urlencode
+    from urlparse import parse_qs, parse_qsl, urlsplit, urlunsplit
+
+    string_types = basestring
 
     def unicode_str(input_string):
 
@@ -16,7 +22,16 @@ if sys.version_info < (3, 0):  # pragma: no cover
 else:  # pragma: no cover
     import unittest
     from unittest import TestCase
-    from urllib.parse import parse_qs
+    from urllib.parse import (
+        parse_qs,
+        parse_qsl,
+        quote,
+        urlencode,
+        urlsplit,
+        urlunsplit,
+    )
+
+    string_types = str
 
     def unicode_str(input_string):
 
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""Tests of deskapi.aio, imported by test_aio on Python 3.6+ only."""
+
+import asyncio
+import json
+
+from deskapi.six import (
+    TestCase,
+    parse_qs,
+    unittest,
+    unicode_str,
+    urlencode,
+)
+
+try:
+    from deskapi import aio
+except ImportError:  # pragma: no cover
+    aio = None
+
+from deskapi.identity import IdentityMap
+from deskapi.tests.util import fixture
+
+
+class FakeResponse(object):
+
+    def __init__(self, status, content):
+
+        self.status = status
+        self._content = content
+
+    async def read(self):
+
+        return self._content.encode('utf8')
+
+    async def __aenter__(self):
+
+        return self
+
+    async def __aexit__(self, *exc_info):
+
+        pass
+
+
+class FakeClientSession(object):
+    """Stand-in for aiohttp.ClientSession serving canned responses."""
+
+    def __init__(self, routes):
+
+        self.routes = routes
+        self.requests = []
+
+    def request(self, method, url, params=None, data=None):
+
+        if params:
+            url = '%s?%s' % (url, urlencode(params))
+        self.requests.append((method, url, data))
+
+        response = self.routes.get((method, url.split('?', 1)[0]))
+        if response is None:
+            return FakeResponse(404, '{}')
+        if callable(response):
+            return FakeResponse(*response(url))
+
+        return FakeResponse(200, response)
+
+
+@unittest.skipIf(aio is None, 'aiohttp is not installed')
+class AsyncDeskApi2Tests(TestCase):
+
+    NUM_ARTICLES = 75
+    PER_PAGE = 50
+
+    def _article_page(self, uri):
+
+        previous = next = 'null'
+
+        if '?' in uri:
+            page = int(parse_qs(uri.split('?', 1)[1]).get('page', ['1'])[0])
+        else:
+            page = 1
+
+        template = fixture('article_template.json')
+        entries = [
+            json.loads(template % dict(index=index + 1))
+            for index in
+            range((page - 1) * self.PER_PAGE,
+                  min(self.NUM_ARTICLES, page * self.PER_PAGE))
+        ]
+
+        if (page * self.PER_PAGE < self.NUM_ARTICLES):
+            next = json.dumps({
+                'href': '/api/v2/articles?page=%s' % (page + 1),
+                'class': 'page',
+            })
+
+        return (200, fixture('article_page_template.json') % dict(
+            entries=json.dumps(entries),
+            next=next,
+            previous=previous,
+            num_entries=self.NUM_ARTICLES,
+        ))
+
+    def setUp(self):
+
+        base = 'https://testing.desk.com/api/v2'
+        self.session = FakeClientSession({
+            ('GET', base + '/articles'): self._article_page,
+            ('GET', base + '/articles/42'): fixture('article_show.json'),
+            ('PATCH', base + '/articles/1'):
+                fixture('article_update_response.json'),
+            ('GET', base + '/articles/1/translations'):
+                fixture('article_translations.json'),
+            ('GET', base + '/topics'): fixture('topic_list_page_1.json'),
+            ('POST', base + '/topics'): fixture('topic_create_response.json'),
+        })
+        self.api = aio.AsyncDeskApi2(sitename='testing', session=self.session)
+
+    def run_async(self, coroutine):
+
+        return asyncio.run(coroutine)
+
+    def test_articles_async_iteration(self):
+
+        async def collect():
+            return [article async for article in self.api.articles()]
+
+        articles = self.run_async(collect())
+
+        self.assertEqual(len(articles), 75)
+        self.assertEqual(len(self.session.requests), 2)
+        self.assertIsInstance(articles[0], aio.AsyncDeskObject)
+        self.assertEqual(articles[0].subject, 'Subject 1')
+
+    def test_async_iteration_fetches_pages_as_needed(self):
+
+        async def first():
+            async for article in self.api.articles():
+                return article
+
+        self.assertEqual(self.run_async(first()).subject, 'Subject 1')
+        self.assertEqual(len(self.session.requests), 1)
+
+    def test_async_iteration_keeps_collection_query(self):
+
+        self.NUM_ARTICLES = 175
+
+        async def collect():
+            articles = self.api.articles(per_page=50, page_workers=2)
+            return [
+                article async for article in
+                articles.filter(in_support_center=True)
+            ]
+
+        self.assertEqual(len(self.run_async(collect())), 175)
+        self.assertEqual(
+            sorted(request[1] for request in self.session.requests),
+            ['https://testing.desk.com/api/v2/articles'
+             '?in_support_center=true&per_page=50&page=%s' % (page,)
+             for page in range(1, 5)],
+        )
+
+    def test_stream_unsupported(self):
+
+        with self.assertRaises(TypeError):
+            self.api.articles(stream=True)
+
+    def test_by_id(self):
+
+        article = self.run_async(self.api.articles().by_id(42))
+
+        self.assertIsInstance(article, aio.AsyncDeskObject)
+        self.assertEqual(
+            self.session.requests[-1][1],
+            'https://testing.desk.com/api/v2/articles/42',
+        )
+
+    def test_request_params_sent(self):
+
+        self.run_async(self.api.request(
+            'articles', params={'in_support_center': True, 'page': 2},
+        ))
+
+        self.assertEqual(
+            self.session.requests[-1][1],
+            'https://testing.desk.com/api/v2/articles'
+            '?in_support_center=true&page=2',
+        )
+
+    def test_by_id_embed(self):
+
+        self.run_async(self.api.articles(embed='topic').by_id(42))
+
+        self.assertEqual(
+            self.session.requests[-1][1],
+            'https://testing.desk.com/api/v2/articles/42?embed=topic',
+        )
+
+    def test_partial_object_missing_field_raises(self):
+
+        article = self.run_async(
+            self.api.articles().by_id(42, fields=['subject']),
+        )
+
+        self.assertTrue(article.partial)
+        with self.assertRaises(KeyError):
+            article.internal_notes_draft
+
+    def test_collection_fields_make_partial_objects(self):
+
+        articles = self.run_async(
+            self.api.articles(fields=['subject']).items(),
+        )
+
+        self.assertTrue(articles[0].partial)
+
+    def test_gather_by_id(self):
+
+        async def gather():
+            articles = self.api.articles()
+            return await asyncio.gather(
+                *[articles.by_id(42) for i in range(5)]
+            )
+
+        self.assertEqual(len(self.run_async(gather())), 5)
+        self.assertEqual(len(self.session.requests), 5)
+
+    def test_get_many(self):
+
+        articles = self.run_async(self.api.articles().get_many([42, 42]))
+
+        self.assertEqual(len(articles), 2)
+        self.assertIs(articles[0], articles[1])
+        self.assertEqual(len(self.session.requests), 1)
+
+    def test_identity_map_shared(self):
+
+        api = aio.AsyncDeskApi2(
+            sitename='testing',
+            session=self.session,
+            identity_map=IdentityMap(),
+        )
+
+        async def lookup():
+            first = await api.articles().by_id(42)
+            return first, await api.articles().by_id(42)
+
+        first, second = self.run_async(lookup())
+
+        self.assertIs(first, second)
+        self.assertEqual(len(self.session.requests), 1)
+
+    def test_identity_mapped_update_refreshes_object(self):
+
+        api = aio.AsyncDeskApi2(
+            sitename='testing',
+            session=self.session,
+            identity_map=IdentityMap(),
+        )
+
+        async def update():
+            article = (await api.articles().items())[0]
+            article.subject = 'New Subject'
+            return article, await article.save()
+
+        article, updated_article = self.run_async(update())
+
+        self.assertIs(updated_article, article)
+        self.assertEqual(article.subject, 'New Subject')
+        self.assertFalse(article._changed)
+
+    def test_article_save(self):
+
+        async def save():
+            article = (await self.api.articles().items())[0]
+            article.subject = 'New Subject'
+            return await article.save()
+
+        updated_article = self.run_async(save())
+
+        self.assertEqual(updated_article.subject, 'New Subject')
+        self.assertEqual(
+            json.loads(self.session.requests[-1][2]),
+            json.loads(fixture('article_update_request.json')),
+        )
+
+    def test_translations_are_keyed_by_locale(self):
+
+        async def translation():
+            article = (await self.api.articles().items())[0]
+            return (await article.translations.items())['es']
+
+        es = self.run_async(translation())
+
+        self.assertEqual(es.subject, 'Tema de Ayuda')
+
+    def test_embedded_translations_need_no_requests(self):
+
+        article = json.loads(fixture('article_show.json'))
+        article['_embedded'] = {
+            'translations': json.loads(fixture('article_translations.json')),
+        }
+        self.session.routes[
+            ('GET', 'https://testing.desk.com/api/v2/articles/42')
+        ] = json.dumps(article)
+
+        async def translation():
+            article = await self.api.articles().by_id(42, embed='translations')
+            return (await article.translations.items())['es']
+
+        es = self.run_async(translation())
+
+        self.assertEqual(es.subject, 'Tema de Ayuda')
+        self.assertEqual(len(self.session.requests), 1)
+
+    def test_registered_collection_hooks_are_used(self):
+
+        topic = self.run_async(self.api.topics().create(name='Social Media'))
+
+        self.assertIsInstance(topic, aio.AsyncDeskObject)
+        self.assertEqual(
+            json.loads(unicode_str(self.session.requests[-1][2])),
+            json.loads(fixture('topic_create_request.json')),
+        )
+
+    def test_sync_container_protocol_unsupported(self):
+
+        with self.assertRaises(TypeError):
+            len(self.api.articles())
+
+    def test_sync_batch_writes_unsupported(self):
+
+        with self.assertRaises(TypeError):
+            self.api.articles().bulk_create([{'subject': 'New'}])
+        with self.assertRaises(TypeError):
+            self.api.batch()
+
+    def test_sync_export_unsupported(self):
+
+        with self.assertRaises(TypeError):
+            self.api.export('/tmp/unused')
+
+    def test_sync_request_settings_unsupported(self):
+
+        for name in ('response_cache', 'rate_limiter', 'retry',
+                     'circuit_breaker'):
+            with self.assertRaises(TypeError):
+                aio.AsyncDeskApi2(
+                    sitename='testing',
+                    session=self.session,
+                    **{name: object()}
+                )
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+import sys
+
+from deskapi.six import (
+    TestCase,
+    unittest,
+)
+
+# The tests use async syntax which older interpreters cannot compile.
+if sys.version_info >= (3, 6):
+    from deskapi.tests.aio_cases import AsyncDeskApi2Tests
+else:
+    @unittest.skip('the asyncio API requires Python 3.6+')
+    class AsyncDeskApi2Tests(TestCase):
+        pass
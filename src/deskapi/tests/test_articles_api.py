@@ -25,10 +25,8 @@ class DeskApi2ArticleTests(TestCase):
 
         previous = next = 'null'
 
-        if '?' in uri:
-            page = int(parse_qs(uri.split('?', 1)[1])['page'][0])
-        else:
-            page = 1
+        query = parse_qs(uri.split('?', 1)[1]) if '?' in uri else {}
+        page = int(query.get('page', [1])[0])
         start_index = (page - 1) * self.PER_PAGE
 
         template = fixture('article_template.json')
@@ -43,14 +41,31 @@ class DeskApi2ArticleTests(TestCase):
                   min(self.NUM_ARTICLES, page * self.PER_PAGE))
         ]
 
+        if 'fields' in query:
+            fields = query['fields'][0].split(',') + ['_links']
+            entries = [
+                dict((key, entry[key]) for key in fields if key in entry)
+                for entry in entries
+            ]
+
+        # Desk echoes the embed option in page links.
+        embed = query.get('embed', [''])[0]
+        suffix = '&embed=%s' % (embed,) if embed else ''
+        if 'topic' in embed.split(','):
+            topic = json.loads(fixture('topic_list_page_1.json'))
+            for entry in entries:
+                entry['_embedded'] = {
+                    'topic': topic['_embedded']['entries'][0],
+                }
+
         if page > 1:
             previous = json.dumps({
-                'href': '/api/v2/articles?page=%s' % (page - 1),
+                'href': '/api/v2/articles?page=%s%s' % (page - 1, suffix),
                 'class': 'page',
             })
         if (page * self.PER_PAGE < self.NUM_ARTICLES):
             next = json.dumps({
-                'href': '/api/v2/articles?page=%s' % (page + 1),
+                'href': '/api/v2/articles?page=%s%s' % (page + 1, suffix),
                 'class': 'page',
             })
 
@@ -69,7 +84,7 @@ class DeskApi2ArticleTests(TestCase):
         # article pagination
         httpretty.register_uri(
             httpretty.GET,
-            re.compile(r'https://testing.desk.com/api/v2/articles(\?page=\d+)?$'),
+            re.compile(r'https://testing.desk.com/api/v2/articles(\?[^/]*)?$'),
             body=self._article_page,
             content_type='application/json',
         )
@@ -77,7 +92,7 @@ class DeskApi2ArticleTests(TestCase):
         # article creation
         httpretty.register_uri(
             httpretty.POST,
-            re.compile('https://testing.desk.com/api/v2/articles(\?page=\d+)?$'),
+            re.compile(r'https://testing.desk.com/api/v2/articles(\?[^/]*)?$'),
             body=fixture('article_create_response.json'),
             content_type='application/json',
         )
@@ -131,13 +146,271 @@ class DeskApi2ArticleTests(TestCase):
         desk_api = models.DeskApi2(sitename='testing')
         articles = desk_api.articles()
 
+        self.assertEqual(len(articles.items()), 75)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
+
+    def test_len_uses_total_entries(self):
+
+        articles = models.DeskApi2(sitename='testing').articles()
+
         self.assertEqual(len(articles), 75)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+    def test_iteration_is_incremental(self):
+
+        articles = models.DeskApi2(sitename='testing').articles()
+
+        for index, article in enumerate(articles):
+            self.assertEqual(article.subject, 'Subject %s' % (index + 1))
+            if index == self.PER_PAGE - 1:
+                break
+
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+        self.assertEqual(len(list(articles)), 75)
         self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
 
-    ## def test_incremental_cache_filling(self):
+    def test_containment_stops_when_found(self):
+
+        articles = models.DeskApi2(sitename='testing').articles()
+        article = articles[1]
+
+        self.assertTrue(article in articles)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
 
-    ##     article = models.DeskApi2(sitename='testing').articles()[0]
-    ##     self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+    def test_parallel_page_fetching(self):
+
+        self.NUM_ARTICLES = 175
+        desk_api = models.DeskApi2(sitename='testing')
+        articles = desk_api.articles(page_workers=3)
+
+        self.assertEqual(len(articles.items()), 175)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 4)
+        self.assertEqual(
+            [article.subject for article in articles.items()],
+            ['Subject %s' % (i + 1) for i in range(175)],
+        )
+
+    def test_parallel_page_fetching_single_page(self):
+
+        self.NUM_ARTICLES = 20
+        desk_api = models.DeskApi2(sitename='testing')
+        articles = desk_api.articles(page_workers=3)
+
+        self.assertEqual(len(articles.items()), 20)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+    def test_incremental_cache_filling(self):
+
+        article = models.DeskApi2(sitename='testing').articles()[0]
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+    def test_incremental_cache_filling_deep_index(self):
+
+        article = models.DeskApi2(sitename='testing').articles()[60]
+        self.assertEqual(article.subject, 'Subject 61')
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
+
+    def test_negative_index(self):
+
+        article = models.DeskApi2(sitename='testing').articles()[-1]
+
+        self.assertEqual(article.subject, 'Subject 75')
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
+
+    def test_index_out_of_range(self):
+
+        articles = models.DeskApi2(sitename='testing').articles()
+
+        with self.assertRaises(IndexError):
+            articles[75]
+
+    def test_slice_fetches_only_needed_pages(self):
+
+        self.NUM_ARTICLES = 275
+        articles = models.DeskApi2(sitename='testing').articles()
+
+        self.assertEqual(
+            [article.subject for article in articles[160:165]],
+            ['Subject %s' % (i + 1) for i in range(160, 165)],
+        )
+        self.assertEqual(
+            [request.path for request in httpretty.httpretty.latest_requests],
+            ['/api/v2/articles', '/api/v2/articles?page=4'],
+        )
+
+    def test_slices_reuse_fetched_pages(self):
+
+        self.NUM_ARTICLES = 275
+        articles = models.DeskApi2(sitename='testing').articles()
+
+        first = articles[140:160]
+        second = articles[150:170:5]
+
+        self.assertIs(first[10], second[0])
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 3)
+
+    def test_per_page_allows_direct_page_access(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            re.compile(r'https://testing.desk.com/api/v2/articles\?per_page=50&page=\d+$'),
+            body=self._article_page,
+            content_type='application/json',
+        )
+        self.NUM_ARTICLES = 275
+        articles = models.DeskApi2(sitename='testing').articles(per_page=50)
+
+        self.assertEqual(articles[260].subject, 'Subject 261')
+        self.assertEqual(
+            [request.path for request in httpretty.httpretty.latest_requests],
+            ['/api/v2/articles?per_page=50&page=6'],
+        )
+
+    def test_article_search(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/articles/search',
+            body=self._article_page,
+            content_type='application/json',
+        )
+
+        results = models.DeskApi2(sitename='testing').articles().search(
+            text='apples',
+            topic_ids=[1, 2],
+            in_support_center=True,
+        )
+
+        self.assertEqual(results[0].subject, 'Subject 1')
+        self.assertEqual(httpretty.last_request().path.split('?')[0],
+                         '/api/v2/articles/search')
+        self.assertEqual(
+            httpretty.last_request().querystring,
+            {
+                'in_support_center': ['true'],
+                'text': ['apples'],
+                'topic_ids': ['1,2'],
+            },
+        )
+
+        self.assertEqual(len(list(results)), 75)
+        self.assertEqual(httpretty.last_request().path.split('?')[0],
+                         '/api/v2/articles/search')
+        self.assertEqual(
+            httpretty.last_request().querystring,
+            {
+                'in_support_center': ['true'],
+                'page': ['2'],
+                'text': ['apples'],
+                'topic_ids': ['1,2'],
+            },
+        )
+
+    def test_article_filter(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            re.compile(r'https://testing.desk.com/api/v2/articles\?in_support_center=false$'),
+            body=self._article_page,
+            content_type='application/json',
+        )
+        articles = models.DeskApi2(sitename='testing').articles()
+        filtered = articles.filter(in_support_center=False)
+
+        self.assertIsInstance(filtered, type(articles))
+        self.assertEqual(len(filtered), 75)
+        self.assertEqual(
+            httpretty.last_request().querystring,
+            {'in_support_center': ['false']},
+        )
+
+        self.assertEqual(len(list(filtered)), 75)
+        self.assertEqual(
+            httpretty.last_request().querystring,
+            {'in_support_center': ['false'], 'page': ['2']},
+        )
+
+    def test_filter_keeps_per_page(self):
+
+        self.NUM_ARTICLES = 275
+        filtered = models.DeskApi2(sitename='testing').articles(
+            per_page=50,
+        ).filter(in_support_center=True)
+
+        self.assertEqual(filtered[260].subject, 'Subject 261')
+        self.assertEqual(
+            [request.path for request in httpretty.httpretty.latest_requests],
+            ['/api/v2/articles?in_support_center=true&per_page=50&page=6'],
+        )
+
+    def test_search_by_id_uses_collection_path(self):
+
+        results = models.DeskApi2(sitename='testing').articles().search(
+            text='apples',
+        )
+
+        self.assertEqual(results.by_id(42).subject, 'Awesome Subject')
+        self.assertEqual(httpretty.last_request().path, '/api/v2/articles/42')
+
+    def test_request_params(self):
+
+        desk_api = models.DeskApi2(sitename='testing')
+        desk_api.request('articles', params={'page': 2, 'unused': None})
+
+        self.assertEqual(httpretty.last_request().path, '/api/v2/articles?page=2')
+
+    def test_by_id_served_from_loaded_pages(self):
+
+        articles = models.DeskApi2(sitename='testing').articles()
+        article = articles[10]
+
+        self.assertIs(articles.by_id(11), article)
+        self.assertIs(articles.by_id('11'), article)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+    def test_by_id_results_are_indexed(self):
+
+        articles = models.DeskApi2(sitename='testing').articles()
+        article = articles.by_id(42)
+
+        self.assertIs(articles.by_id(42), article)
+        self.assertTrue('/api/v2/articles/42' in articles)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+    def test_containment_by_id_and_href(self):
+
+        articles = models.DeskApi2(sitename='testing').articles()
+
+        self.assertTrue(60 in articles)
+        self.assertTrue('/api/v2/articles/2' in articles)
+        self.assertFalse(500 in articles)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
+
+    def test_get_many_served_from_loaded_pages(self):
+
+        articles = models.DeskApi2(sitename='testing').articles()
+        articles[0]
+
+        result = articles.get_many([2, 1, 2])
+
+        self.assertEqual(
+            [article.api_href for article in result],
+            ['/api/v2/articles/2', '/api/v2/articles/1', '/api/v2/articles/2'],
+        )
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+    def test_get_many_fetches_missing_once(self):
+
+        articles = models.DeskApi2(sitename='testing').articles()
+
+        result = articles.get_many([42, '42'])
+
+        self.assertIs(result[0], result[1])
+        self.assertEqual(
+            [request.path for request in httpretty.httpretty.latest_requests],
+            ['/api/v2/articles/42'],
+        )
 
     def test_article_property_access(self):
 
@@ -253,6 +526,256 @@ class DeskApi2ArticleTests(TestCase):
             json.loads(fixture('article_translation_update_request.json')),
         )
 
+    def test_article_translations_are_memoized(self):
+
+        desk_api = models.DeskApi2(sitename='testing')
+        article = desk_api.articles()[0]
+        httpretty.httpretty.latest_requests = []
+
+        self.assertTrue(article.translations is article.translations)
+        article.translations['es']
+        article.translations['en']
+
+        self.assertEqual(
+            [request.path for request in httpretty.httpretty.latest_requests],
+            ['/api/v2/articles/1/translations'],
+        )
+
+    def test_created_translation_added_to_loaded_translations(self):
+
+        desk_api = models.DeskApi2(sitename='testing')
+        article = desk_api.articles()[0]
+        article.translations.items()
+
+        ja = article.translations.create(locale='ja', subject='日本語訳')
+
+        self.assertTrue(article.translations[ja.locale] is ja)
+
+    def test_load_translations(self):
+
+        def translations(method, uri, headers):
+            article_path = uri.split('desk.com', 1)[1].rsplit('/', 1)[0]
+            return (200, headers, fixture('article_translations.json').replace(
+                '/api/v2/articles/1', article_path,
+            ).encode('utf8'))
+
+        httpretty.register_uri(
+            httpretty.GET,
+            re.compile(r'https://testing.desk.com/api/v2/articles/\d+/translations$'),
+            body=translations,
+            content_type='application/json',
+        )
+
+        desk_api = models.DeskApi2(sitename='testing')
+        articles = desk_api.articles()[:5]
+
+        loaded = models.load_translations(
+            articles, locales=['es'], max_workers=3,
+        )
+
+        self.assertEqual(sorted(loaded), [1, 2, 3, 4, 5])
+        self.assertEqual(list(loaded[3]), ['es'])
+        self.assertEqual(
+            loaded[3]['es'].api_href,
+            '/api/v2/articles/3/translations/es',
+        )
+
+        # the fetched translations are kept on the articles
+        httpretty.httpretty.latest_requests = []
+        self.assertTrue('en' in articles[3].translations)
+        self.assertEqual(httpretty.httpretty.latest_requests, [])
+
+    def test_embedded_resources_need_no_requests(self):
+
+        articles = models.DeskApi2(sitename='testing').articles(
+            embed=['topic'],
+        )
+
+        topics = [article.topic for article in articles]
+
+        self.assertEqual(len(topics), 75)
+        self.assertEqual(topics[0].name, 'Customer Support')
+        self.assertEqual(topics[0].api_href, '/api/v2/topics/1')
+        self.assertEqual(
+            [request.path for request in httpretty.httpretty.latest_requests],
+            ['/api/v2/articles?embed=topic',
+             '/api/v2/articles?embed=topic&page=2'],
+        )
+
+    def test_embed_is_kept_by_filter(self):
+
+        articles = models.DeskApi2(sitename='testing').articles(embed='topic')
+
+        article = articles.filter(in_support_center=True)[0]
+
+        self.assertEqual(article.topic.name, 'Customer Support')
+        self.assertEqual(
+            httpretty.last_request().querystring,
+            {'embed': ['topic'], 'in_support_center': ['true']},
+        )
+
+    def test_by_id_embed(self):
+
+        articles = models.DeskApi2(sitename='testing').articles()
+
+        articles.by_id(42, embed=['topic', 'translations'])
+
+        self.assertEqual(
+            httpretty.last_request().querystring,
+            {'embed': ['topic,translations']},
+        )
+
+    def test_embedded_translations_need_no_requests(self):
+
+        article = json.loads(fixture('article_show.json'))
+        article['_embedded'] = {
+            'translations': json.loads(fixture('article_translations.json')),
+        }
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/articles/42',
+            body=json.dumps(article),
+            content_type='application/json',
+        )
+        articles = models.DeskApi2(sitename='testing').articles()
+
+        article = articles.by_id(42, embed='translations')
+        httpretty.httpretty.latest_requests = []
+
+        self.assertEqual(sorted(article.translations.items()), ['en', 'es'])
+        self.assertEqual(
+            article.translations['es'].subject,
+            unicode_str('Tema de Ayuda'),
+        )
+        self.assertEqual(httpretty.httpretty.latest_requests, [])
+
+    def test_missing_embedded_resource_is_refetched(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/articles/1',
+            body=fixture('article_show.json'),
+            content_type='application/json',
+        )
+        articles = models.DeskApi2(sitename='testing').articles()
+        articles[0]
+
+        articles.by_id(1, embed='topic')
+
+        self.assertEqual(
+            httpretty.last_request().path,
+            '/api/v2/articles/1?embed=topic',
+        )
+
+    def test_fields_projection(self):
+
+        articles = models.DeskApi2(sitename='testing').articles(
+            fields=['subject', 'position'],
+        )
+
+        article = articles[0]
+
+        self.assertTrue(article.partial)
+        self.assertEqual(article.subject, 'Subject 1')
+        self.assertFalse('body' in article._entry)
+        self.assertEqual(
+            httpretty.last_request().querystring,
+            {'fields': ['subject,position']},
+        )
+
+        self.assertTrue(articles[60].partial)
+        self.assertFalse('body' in articles[60]._entry)
+        self.assertEqual(
+            httpretty.last_request().querystring,
+            {'fields': ['subject,position'], 'page': ['2']},
+        )
+
+    def test_partial_object_fetches_missing_fields(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/articles/1',
+            body=fixture('article_template.json') % dict(index=1),
+            content_type='application/json',
+        )
+        article = models.DeskApi2(sitename='testing').articles(
+            fields='subject',
+        )[0]
+
+        self.assertEqual(article.body, '<p>Body of 1</p>')
+        self.assertFalse(article.partial)
+        self.assertEqual(httpretty.last_request().path, '/api/v2/articles/1')
+
+    def test_by_id_fields(self):
+
+        articles = models.DeskApi2(sitename='testing').articles()
+
+        article = articles.by_id(42, fields=['subject'])
+
+        self.assertTrue(article.partial)
+        self.assertEqual(
+            httpretty.last_request().querystring,
+            {'fields': ['subject']},
+        )
+
+    def test_by_id_refetches_item_missing_fields(self):
+
+        articles = models.DeskApi2(sitename='testing').articles(
+            fields='subject',
+        )
+        articles[0]
+        articles.by_id(1, fields='subject')
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/articles/1',
+            body=fixture('article_template.json') % dict(index=1),
+            content_type='application/json',
+        )
+        articles.by_id(1, fields='subject,body')
+
+        self.assertEqual(
+            httpretty.last_request().querystring,
+            {'fields': ['subject,body']},
+        )
+
+    def test_translation_fields_include_locale(self):
+
+        article = models.DeskApi2(sitename='testing').articles()[0]
+
+        translations = article.translations.filter(fields=['subject'])
+
+        self.assertEqual(translations['es'].subject, 'Tema de Ayuda')
+        self.assertEqual(
+            httpretty.last_request().querystring,
+            {'fields': ['subject,locale']},
+        )
+
+    def test_save_all(self):
+
+        httpretty.register_uri(
+            httpretty.PATCH,
+            'https://testing.desk.com/api/v2/articles/2',
+            status=500,
+        )
+        articles = models.DeskApi2(sitename='testing').articles()[0:3]
+        articles[0].subject = 'New Subject'
+        articles[1].subject = 'New Subject'
+
+        saved, errors = models.save_all(articles, max_workers=2)
+
+        self.assertEqual([article.subject for article in saved], ['New Subject'])
+        self.assertEqual(len(errors), 1)
+        self.assertIs(errors[0][0], articles[1])
+        self.assertEqual(errors[0][1].status, '500')
+        self.assertEqual(
+            sorted(set(request.path
+                       for request in httpretty.httpretty.latest_requests
+                       if request.method == 'PATCH')),
+            ['/api/v2/articles/1', '/api/v2/articles/2'],
+        )
+
     def test_get_article_by_id(self):
 
         desk_api = models.DeskApi2(sitename='testing')
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+from deskapi.six import TestCase
+
+import httpretty
+
+from deskapi import models
+from deskapi.auth import OAuth1Signer
+from deskapi.tests.util import fixture
+
+
+def signer(**kwargs):
+
+    # credentials from the example in the OAuth 1.0 specification
+    return OAuth1Signer(
+        'dpf43f3p2l4k3l03',
+        'kd94hf93k423kf44',
+        'nnch734d00sl2jdk',
+        'pfkkdhi9sl3r4s00',
+        clock=lambda: 1191242096,
+        nonce=lambda: 'kllo9940pd9333jh',
+        **kwargs
+    )
+
+
+class OAuth1SignerTests(TestCase):
+
+    def test_specification_example(self):
+
+        self.assertEqual(
+            signer().signature(
+                'GET',
+                'http://photos.example.net/photos'
+                '?file=vacation.jpg&size=original',
+                timestamp='1191242096',
+                nonce='kllo9940pd9333jh',
+            ),
+            'tR3+Ty81lMeYAr/Fid0kMTYa/WM=',
+        )
+
+    def test_default_port_ignored(self):
+
+        self.assertEqual(
+            signer().signature('GET', 'https://Example.com:443/a', None, '1', 'n'),
+            signer().signature('GET', 'https://example.com/a', None, '1', 'n'),
+        )
+
+    def test_signature_covers_form_body(self):
+
+        self.assertNotEqual(
+            signer().signature('POST', 'https://example.com/a', 'b=1', '1', 'n'),
+            signer().signature('POST', 'https://example.com/a', 'b=2', '1', 'n'),
+        )
+
+
+class SessionSigningTests(TestCase):
+
+    def setUp(self):
+        httpretty.httpretty.reset()
+        httpretty.enable()
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            body=fixture('topic_list_page_1.json'),
+            content_type='application/json',
+        )
+
+    def tearDown(self):
+
+        httpretty.disable()
+
+    def test_requests_signed(self):
+
+        api = models.DeskApi2(sitename='testing', auth=signer())
+
+        api.topics().items()
+
+        authorization = httpretty.last_request().headers['Authorization']
+        self.assertTrue(authorization.startswith('OAuth '))
+        self.assertTrue('oauth_token="nnch734d00sl2jdk"' in authorization)
+        self.assertTrue('oauth_timestamp="1191242096"' in authorization)
+        self.assertTrue('oauth_signature="' in authorization)
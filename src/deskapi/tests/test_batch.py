@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from deskapi.six import (
+    TestCase,
+    unicode_str,
+)
+
+import httpretty
+
+from deskapi import models
+from deskapi.identity import IdentityMap
+
+
+class DeskBatchTests(TestCase):
+
+    def _batch(self, request, uri, headers):
+
+        batch_requests = json.loads(unicode_str(request.body))['requests']
+        self.batches.append(batch_requests)
+        if len(self.batches) in self.failing_batches:
+            return (503, headers, '{}')
+
+        responses = {}
+        for key, batch_request in batch_requests.items():
+            if batch_request['url'].endswith('/999'):
+                responses[key] = {'status': 404, 'body': {}}
+                continue
+
+            href = batch_request['url']
+            if batch_request['method'] == 'POST':
+                href = '%s/%s' % (href, 100 + int(key))
+
+            body = dict(batch_request['body'])
+            body['_links'] = {'self': {'href': href, 'class': 'article'}}
+            responses[key] = {'status': 200, 'body': body}
+
+        return (200, headers, json.dumps({'responses': responses}))
+
+    def setUp(self):
+
+        self.batches = []
+        self.failing_batches = ()
+
+        httpretty.httpretty.reset()
+        httpretty.enable()
+
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://testing.desk.com/api/v2/batch',
+            body=self._batch,
+            content_type='application/json',
+        )
+
+    def tearDown(self):
+
+        httpretty.disable()
+
+    def _article(self, id):
+
+        return models.DeskApi2(sitename='testing').object({
+            'subject': 'Subject %s' % (id,),
+            '_links': {'self': {'href': '/api/v2/articles/%s' % (id,)}},
+        })
+
+    def test_bulk_create_chunks_requests(self):
+
+        articles = models.DeskApi2(sitename='testing').articles()
+
+        results = articles.bulk_create(
+            [{'subject': 'Subject %s' % (i,)} for i in range(5)],
+            max_size=2,
+        )
+
+        self.assertEqual([len(batch) for batch in self.batches], [2, 2, 1])
+        self.assertEqual(
+            self.batches[0]['0'],
+            {
+                'method': 'POST',
+                'url': '/api/v2/articles',
+                'body': {'subject': 'Subject 0'},
+            },
+        )
+        self.assertEqual(
+            [article.subject for article in results],
+            ['Subject %s' % (i,) for i in range(5)],
+        )
+
+    def test_bulk_create_uses_collection_defaults(self):
+
+        topics = models.DeskApi2(sitename='testing').topics()
+
+        topics.bulk_create([{'name': 'Social Media'}])
+
+        self.assertEqual(
+            self.batches[0]['0']['body'],
+            {
+                'name': 'Social Media',
+                'allow_questions': False,
+                'in_support_center': False,
+            },
+        )
+
+    def test_bulk_update_sends_changes(self):
+
+        articles = [self._article(1), self._article(2)]
+        for article in articles:
+            article.subject = 'Changed'
+
+        results = models.DeskApi2(sitename='testing').articles().bulk_update(
+            articles,
+        )
+
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(
+            self.batches[0]['1'],
+            {
+                'method': 'PATCH',
+                'url': '/api/v2/articles/2',
+                'body': {'subject': 'Changed'},
+            },
+        )
+        self.assertEqual(
+            [article.api_href for article in results],
+            ['/api/v2/articles/1', '/api/v2/articles/2'],
+        )
+
+    def test_failed_batch_request_keeps_other_results(self):
+
+        self.failing_batches = (2,)
+        articles = models.DeskApi2(sitename='testing').articles()
+
+        results = articles.bulk_create(
+            [{'subject': 'Subject %s' % (i,)} for i in range(5)],
+            max_size=2,
+        )
+
+        self.assertEqual(len(self.batches), 3)
+        self.assertEqual(
+            [result.status if isinstance(result, models.DeskError)
+             else result.subject for result in results],
+            ['Subject 0', 'Subject 1', '503', '503', 'Subject 4'],
+        )
+
+    def test_bulk_update_skips_unchanged_objects(self):
+
+        articles = [self._article(1), self._article(2)]
+        articles[1].subject = 'Changed'
+
+        results = models.DeskApi2(sitename='testing').articles().bulk_update(
+            articles,
+        )
+
+        self.assertEqual(list(self.batches[0].values()), [{
+            'method': 'PATCH',
+            'url': '/api/v2/articles/2',
+            'body': {'subject': 'Changed'},
+        }])
+        self.assertEqual(len(results), 1)
+
+    def test_bulk_update_clears_saved_changes_of_mapped_objects(self):
+
+        api = models.DeskApi2(sitename='testing', identity_map=IdentityMap())
+        article = api.object({
+            'subject': 'Subject 1',
+            '_links': {'self': {'href': '/api/v2/articles/1'}},
+        })
+        article.subject = 'Changed'
+
+        results = api.articles().bulk_update([article])
+
+        self.assertIs(results[0], article)
+        self.assertEqual(article.subject, 'Changed')
+        self.assertEqual(article._changed, {})
+        self.assertEqual(api.articles().bulk_update([article]), [])
+        self.assertEqual(len(self.batches), 1)
+
+    def test_failed_items_reported_as_errors(self):
+
+        with models.DeskApi2(sitename='testing').batch() as batch:
+            batch.update(self._article(1), subject='One')
+            batch.update(self._article(999), subject='Missing')
+
+        self.assertIsInstance(batch.results[0], models.DeskObject)
+        self.assertIsInstance(batch.results[1], models.DeskError)
+        self.assertEqual(batch.results[1].status, '404')
+
+    def test_batch_not_sent_on_exception(self):
+
+        with self.assertRaises(ValueError):
+            with models.DeskApi2(sitename='testing').batch() as batch:
+                batch.update(self._article(1), subject='One')
+                raise ValueError()
+
+        self.assertEqual(self.batches, [])
+        self.assertEqual(batch.results, None)
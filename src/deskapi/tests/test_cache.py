@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+import shutil
+import tempfile
+
+from deskapi.six import TestCase
+
+import httpretty
+
+from deskapi import models
+from deskapi.cache import (
+    CachedResponse,
+    FileCache,
+    MemoryCache,
+)
+from deskapi.tests.util import fixture
+
+
+class MemoryCacheTests(TestCase):
+
+    def test_get_returns_stored_entry(self):
+
+        cache = MemoryCache()
+        entry = CachedResponse(b'{}', '"abc"', None)
+        cache.set('key', entry)
+
+        self.assertEqual(cache.get('key'), entry)
+        self.assertEqual(cache.get('missing'), None)
+
+    def test_least_recently_used_evicted_by_size(self):
+
+        cache = MemoryCache(max_size=10)
+        cache.set('a', CachedResponse(b'aaaa', None, None))
+        cache.set('b', CachedResponse(b'bbbb', None, None))
+        cache.get('a')
+        cache.set('c', CachedResponse(b'cccc', None, None))
+
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a').content, b'aaaa')
+        self.assertEqual(cache.size, 8)
+
+    def test_oversized_entries_not_stored(self):
+
+        cache = MemoryCache(max_size=2)
+        cache.set('a', CachedResponse(b'aaaa', None, None))
+
+        self.assertEqual(len(cache), 0)
+
+
+class FileCacheTests(TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test_entries_persist_across_instances(self):
+
+        FileCache(self.directory).set(
+            'key',
+            CachedResponse(b'{"a": 1}', '"abc"', 'Wed, 21 Aug 2013 00:20:04 GMT'),
+        )
+
+        entry = FileCache(self.directory).get('key')
+
+        self.assertEqual(entry.content, b'{"a": 1}')
+        self.assertEqual(entry.etag, '"abc"')
+        self.assertEqual(entry.last_modified, 'Wed, 21 Aug 2013 00:20:04 GMT')
+
+    def test_least_recently_used_evicted_by_size(self):
+
+        cache = FileCache(self.directory, max_size=300)
+        cache.set('a', CachedResponse(b'a' * 60, None, None))
+        cache.set('b', CachedResponse(b'b' * 60, None, None))
+        cache.get('a')
+        cache.set('c', CachedResponse(b'c' * 60, None, None))
+
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a').content, b'a' * 60)
+        self.assertEqual(len(FileCache(self.directory)), 2)
+
+
+class ConditionalRequestTests(TestCase):
+
+    ETAG = '"topics-1"'
+
+    def _topics(self, request, uri, headers):
+
+        self.request_headers.append(request.headers)
+        if request.headers.get('If-None-Match') == self.ETAG:
+            return (304, headers, '')
+
+        headers['ETag'] = self.ETAG
+        return (200, headers, fixture('topic_list_page_1.json'))
+
+    def setUp(self):
+
+        self.request_headers = []
+
+        httpretty.httpretty.reset()
+        httpretty.enable()
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            body=self._topics,
+            content_type='application/json',
+        )
+
+    def tearDown(self):
+
+        httpretty.disable()
+
+    def test_not_modified_served_from_cache(self):
+
+        desk_api = models.DeskApi2(
+            sitename='testing',
+            response_cache=MemoryCache(),
+        )
+
+        self.assertEqual(len(desk_api.topics()), 2)
+        self.assertEqual(len(desk_api.topics()), 2)
+
+        self.assertEqual(self.request_headers[0].get('If-None-Match'), None)
+        self.assertEqual(self.request_headers[1].get('If-None-Match'), self.ETAG)
+
+    def test_uncached_session_does_not_revalidate(self):
+
+        desk_api = models.DeskApi2(sitename='testing')
+
+        desk_api.topics().items()
+        desk_api.topics().items()
+
+        self.assertEqual(self.request_headers[1].get('If-None-Match'), None)
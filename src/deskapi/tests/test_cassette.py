@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from deskapi.six import TestCase
+
+import httpretty
+
+from deskapi import models
+from deskapi.cassette import (
+    Cassette,
+    CassetteMiss,
+)
+from deskapi.tests.util import fixture
+
+
+class CassetteTests(TestCase):
+
+    def setUp(self):
+        httpretty.httpretty.reset()
+        httpretty.enable()
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            body=fixture('topic_list_page_1.json'),
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.PATCH,
+            'https://testing.desk.com/api/v2/topics/1',
+            body=fixture('topic_patch_topic_1.json'),
+            content_type='application/json',
+        )
+
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'desk.jsonl.gz')
+
+    def tearDown(self):
+
+        httpretty.disable()
+        shutil.rmtree(self.directory)
+
+    def record(self):
+
+        with Cassette(self.path, mode=Cassette.RECORD) as cassette:
+            api = models.DeskApi2(
+                sitename='testing',
+                auth=('user', 'secret'),
+                cassette=cassette,
+            )
+            topic = api.topics()[0]
+            topic.update(name='Updated Customer Support')
+
+        # nothing further may reach the network
+        httpretty.httpretty.reset()
+
+    def replay_api(self, **kwargs):
+
+        return models.DeskApi2(
+            sitename='testing',
+            cassette=Cassette(self.path, **kwargs),
+        )
+
+    def test_replay_without_network(self):
+
+        self.record()
+        api = self.replay_api()
+
+        topics = api.topics()
+        self.assertEqual(topics[0].name, 'Customer Support')
+        self.assertEqual(len(topics), 2)
+
+        updated = topics[0].update(name='Updated Customer Support')
+        self.assertEqual(
+            updated.name,
+            json.loads(fixture('topic_patch_topic_1.json'))['name'],
+        )
+        self.assertEqual(httpretty.httpretty.latest_requests, [])
+
+    def test_archive_contents(self):
+
+        self.record()
+
+        with gzip.open(self.path, 'rb') as archive:
+            records = [json.loads(line.decode('utf8')) for line in archive]
+
+        self.assertEqual(
+            [(record['method'], record['url'], record['status'])
+             for record in records],
+            [('GET', 'https://testing.desk.com/api/v2/topics', 200),
+             ('PATCH', 'https://testing.desk.com/api/v2/topics/1', 200)],
+        )
+        self.assertEqual(
+            json.loads(records[0]['body']),
+            json.loads(fixture('topic_list_page_1.json')),
+        )
+        self.assertTrue('elapsed' in records[0])
+        self.assertFalse(
+            'authorization' in
+            [name.lower() for name in records[0]['request_headers']]
+        )
+
+    def test_unrecorded_request_raises(self):
+
+        self.record()
+        api = self.replay_api()
+
+        with self.assertRaises(CassetteMiss):
+            api.articles()[0]
+
+    def test_different_body_is_not_matched(self):
+
+        self.record()
+        topic = self.replay_api().topics()[0]
+
+        with self.assertRaises(CassetteMiss):
+            topic.update(name='Something Else')
+
+    def test_replay_latency(self):
+
+        self.record()
+        sleeps = []
+        api = self.replay_api(latency=True, sleep=sleeps.append)
+
+        api.topics()[0]
+
+        self.assertEqual(len(sleeps), 1)
+        self.assertTrue(sleeps[0] >= 0)
+
+    def test_repeated_requests_replayed_in_order(self):
+
+        with Cassette(self.path, mode=Cassette.RECORD) as cassette:
+            api = models.DeskApi2(sitename='testing', cassette=cassette)
+            api.topics()[0]
+            httpretty.register_uri(
+                httpretty.GET,
+                'https://testing.desk.com/api/v2/topics',
+                body=fixture('topic_list_page_1.json').replace(
+                    'Customer Support', 'Renamed'),
+                content_type='application/json',
+            )
+            api.topics()[0]
+
+        api = self.replay_api()
+
+        self.assertEqual(
+            [api.topics()[0].name for _ in range(3)],
+            ['Customer Support', 'Renamed', 'Renamed'],
+        )
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from deskapi.six import TestCase
+
+import httpretty
+
+from deskapi import models
+from deskapi.codec import (
+    PageStream,
+    StdlibCodec,
+    default_codec,
+)
+from deskapi.tests.util import fixture
+
+
+def _chunks(content, size):
+
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+
+class CountingCodec(StdlibCodec):
+
+    def __init__(self):
+
+        self.loads_calls = 0
+        self.dumps_calls = 0
+
+    def loads(self, data):
+
+        self.loads_calls += 1
+        return super(CountingCodec, self).loads(data)
+
+    def dumps(self, obj):
+
+        self.dumps_calls += 1
+        return super(CountingCodec, self).dumps(obj)
+
+
+class CodecTests(TestCase):
+
+    def test_default_codec_round_trips(self):
+
+        codec = default_codec()
+        data = {'subject': u'Café', 'count': 2}
+
+        self.assertEqual(codec.loads(codec.dumps(data)), data)
+
+    def test_stdlib_codec_accepts_bytes(self):
+
+        self.assertEqual(
+            StdlibCodec().loads(u'{"a": "é"}'.encode('utf8')),
+            {'a': u'é'},
+        )
+
+
+class PageStreamTests(TestCase):
+
+    def _check(self, content):
+
+        expected = json.loads(content.decode('utf8'))
+
+        for size in (1, 7, 64, len(content)):
+            stream = PageStream(_chunks(content, size))
+            entries = list(stream)
+
+            self.assertEqual(entries, expected['_embedded']['entries'])
+            self.assertEqual(stream.page['total_entries'],
+                             expected['total_entries'])
+            self.assertEqual(stream.page['_links'], expected['_links'])
+            self.assertEqual(stream.page['_embedded'], {})
+
+    def test_topic_page(self):
+
+        self._check(fixture('topic_list_page_1.json').encode('utf8'))
+
+    def test_multibyte_characters_split_across_chunks(self):
+
+        self._check(json.dumps({
+            'total_entries': 12345,
+            '_embedded': {'entries': [{'subject': u'Crème brûlée'}, 3.5]},
+            '_links': {'next': None},
+        }, ensure_ascii=False).encode('utf8'))
+
+    def test_empty_entries(self):
+
+        self._check(b'{"total_entries": 0, "_embedded": {"entries": []},'
+                    b' "_links": {}}')
+
+    def test_entries_yielded_before_page_is_read(self):
+
+        content = fixture('topic_list_page_1.json').encode('utf8')
+        chunks = iter(_chunks(content, 16))
+        stream = iter(PageStream(chunks))
+
+        next(stream)
+
+        self.assertTrue(list(chunks))
+
+    def test_large_entry_decoded_in_few_attempts(self):
+
+        class CountingDecoder(json.JSONDecoder):
+
+            attempts = 0
+
+            def raw_decode(self, s, idx=0):
+                CountingDecoder.attempts += 1
+                return json.JSONDecoder.raw_decode(self, s, idx)
+
+        entry = {'body': 'x' * 100000}
+        content = json.dumps({
+            'total_entries': 1,
+            '_embedded': {'entries': [entry]},
+        }).encode('utf8')
+        stream = PageStream(_chunks(content, 64))
+        stream._decoder = CountingDecoder()
+
+        self.assertEqual(list(stream), [entry])
+        # One chunk at a time would take over 1500 attempts.
+        self.assertTrue(CountingDecoder.attempts < 30)
+
+    def test_truncated_page(self):
+
+        content = fixture('topic_list_page_1.json').encode('utf8')
+
+        with self.assertRaises(ValueError):
+            list(PageStream([content[:len(content) // 2]]))
+
+
+class SessionCodecTests(TestCase):
+
+    def setUp(self):
+        httpretty.httpretty.reset()
+        httpretty.enable()
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            body=fixture('topic_list_page_1.json'),
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.PATCH,
+            'https://testing.desk.com/api/v2/topics/1',
+            body=fixture('topic_patch_topic_1.json'),
+            content_type='application/json',
+        )
+
+    def tearDown(self):
+
+        httpretty.disable()
+
+    def test_custom_codec_used_once_per_request(self):
+
+        codec = CountingCodec()
+        topics = models.DeskApi2(sitename='testing', codec=codec).topics()
+
+        topic = topics[0]
+        self.assertEqual(codec.loads_calls, 1)
+
+        topic.update(name='Updated Customer Support')
+        self.assertEqual(codec.dumps_calls, 1)
+        self.assertEqual(codec.loads_calls, 2)
+        self.assertEqual(
+            json.loads(httpretty.last_request().body.decode('utf8')),
+            {'name': 'Updated Customer Support'},
+        )
+
+    def test_streamed_collection_matches_buffered(self):
+
+        desk_api = models.DeskApi2(sitename='testing')
+        buffered = desk_api.topics()
+        streamed = desk_api.topics(stream=True)
+
+        self.assertEqual(
+            [topic._entry for topic in streamed],
+            [topic._entry for topic in buffered],
+        )
+        self.assertEqual(len(streamed), len(buffered))
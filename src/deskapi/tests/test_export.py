@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from deskapi.six import TestCase
+
+import httpretty
+
+from deskapi import models
+from deskapi.tests.util import fixture
+
+
+def _topic_page(request, uri, headers):
+
+    # serve the topic list fixture one topic per page
+    topics = json.loads(fixture('topic_list_page_1.json'))
+    page = int(request.querystring.get('page', ['1'])[0])
+    entries = topics['_embedded']['entries']
+
+    topics['_embedded']['entries'] = entries[page - 1:page]
+    if page < len(entries):
+        topics['_links']['next'] = {
+            'href': '/api/v2/topics?page=%d&per_page=1' % (page + 1,),
+            'class': 'page',
+        }
+
+    return (200, headers, json.dumps(topics))
+
+
+class ExportTests(TestCase):
+
+    def setUp(self):
+        httpretty.httpretty.reset()
+        httpretty.enable()
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            body=_topic_page,
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics/1/translations',
+            body=fixture('topic_translations.json'),
+            content_type='application/json',
+        )
+
+        self.api = models.DeskApi2(sitename='testing')
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        httpretty.disable()
+        shutil.rmtree(self.directory)
+
+    def lines(self, filename, open=open):
+
+        with open(os.path.join(self.directory, filename), 'rb') as export:
+            return [json.loads(line.decode('utf8')) for line in export]
+
+    def test_export(self):
+
+        manifest = self.api.export(
+            self.directory, resources=['topics', 'translations'],
+        )
+
+        topics = json.loads(fixture('topic_list_page_1.json'))
+        translations = json.loads(fixture('topic_translations.json'))
+
+        self.assertEqual(
+            self.lines('topics.jsonl'),
+            topics['_embedded']['entries'],
+        )
+        # both topics link to the same translations
+        self.assertEqual(
+            self.lines('translations.jsonl'),
+            translations['_embedded']['entries'] * 2,
+        )
+
+        self.assertEqual(manifest['sitename'], 'testing')
+        self.assertEqual(sorted(manifest['resources']), ['topics', 'translations'])
+        self.assertEqual(manifest['resources']['topics'], {
+            'file': 'topics.jsonl',
+            'count': 2,
+            'updated_at': '2013-08-16T00:25:04Z',
+        })
+        self.assertEqual(manifest['resources']['translations']['count'], 4)
+        self.assertEqual(
+            manifest['resources']['translations']['updated_at'],
+            '2013-08-21T00:24:07Z',
+        )
+
+        with open(os.path.join(self.directory, 'manifest.json')) as written:
+            self.assertEqual(json.load(written), manifest)
+
+    def test_pages_followed_and_compressed(self):
+
+        manifest = self.api.export(
+            self.directory, resources=['topics'], compress=True, per_page=1,
+        )
+
+        self.assertEqual(
+            [topic['name'] for topic in self.lines('topics.jsonl.gz', gzip.open)],
+            ['Customer Support', 'Another Topic'],
+        )
+        self.assertEqual(manifest['resources']['topics']['file'],
+                         'topics.jsonl.gz')
+        self.assertEqual(
+            sorted(request.path for request in httpretty.httpretty.latest_requests),
+            ['/api/v2/topics?page=2&per_page=1', '/api/v2/topics?per_page=1'],
+        )
+
+    def test_unknown_resource(self):
+
+        with self.assertRaises(ValueError):
+            self.api.export(self.directory, resources=['cases'])
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from deskapi.six import TestCase
+
+import httpretty
+
+from deskapi import models
+from deskapi.identity import IdentityMap
+from deskapi.tests.util import fixture
+
+
+class FakeClock(object):
+
+    def __init__(self):
+
+        self.now = 1000.0
+
+    def time(self):
+
+        return self.now
+
+
+class Item(object):
+
+    def __init__(self, api_href):
+
+        self.api_href = api_href
+
+
+class IdentityMapTests(TestCase):
+
+    def setUp(self):
+
+        self.clock = FakeClock()
+
+    def test_get_counts_hits_and_misses(self):
+
+        identity_map = IdentityMap()
+        item = Item('/api/v2/articles/1')
+        identity_map.add(item)
+
+        self.assertIs(identity_map.get('/api/v2/articles/1'), item)
+        self.assertEqual(identity_map.get('/api/v2/articles/2'), None)
+        self.assertEqual((identity_map.hits, identity_map.misses), (1, 1))
+
+    def test_least_recently_used_evicted(self):
+
+        identity_map = IdentityMap(max_size=2)
+        for n in (1, 2):
+            identity_map.add(Item('/api/v2/articles/%s' % (n,)))
+        identity_map.get('/api/v2/articles/1')
+        identity_map.add(Item('/api/v2/articles/3'))
+
+        self.assertEqual(identity_map.get('/api/v2/articles/2'), None)
+        self.assertTrue(identity_map.get('/api/v2/articles/1'))
+        self.assertEqual(len(identity_map), 2)
+        self.assertEqual(identity_map.evictions, 1)
+
+    def test_objects_expire_after_ttl(self):
+
+        identity_map = IdentityMap(ttl=60, clock=self.clock.time)
+        item = Item('/api/v2/articles/1')
+        identity_map.add(item)
+
+        self.clock.now += 59
+        self.assertIs(identity_map.get(item.api_href), item)
+
+        self.clock.now += 1
+        self.assertEqual(identity_map.get(item.api_href), None)
+        self.assertEqual(identity_map.evictions, 1)
+        self.assertEqual(len(identity_map), 0)
+
+    def test_storing_again_renews_ttl(self):
+
+        identity_map = IdentityMap(ttl=60, clock=self.clock.time)
+        item = Item('/api/v2/articles/1')
+        identity_map.add(item)
+
+        self.clock.now += 50
+        identity_map.add(item)
+        self.clock.now += 50
+
+        self.assertIs(identity_map.get(item.api_href), item)
+
+
+class SessionIdentityMapTests(TestCase):
+
+    def setUp(self):
+        httpretty.httpretty.reset()
+        httpretty.enable()
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/articles/42',
+            body=fixture('article_show.json'),
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/articles/1',
+            body=fixture('article_template.json') % dict(index=1),
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.PATCH,
+            'https://testing.desk.com/api/v2/articles/1',
+            body=fixture('article_update_response.json'),
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            body=fixture('topic_list_page_1.json'),
+            content_type='application/json',
+        )
+
+        self.clock = FakeClock()
+        self.identity_map = IdentityMap(ttl=60, clock=self.clock.time)
+        self.api = models.DeskApi2(
+            sitename='testing',
+            identity_map=self.identity_map,
+        )
+
+    def tearDown(self):
+
+        httpretty.disable()
+
+    def test_by_id_returns_live_object(self):
+
+        first = self.api.articles().by_id(42)
+        second = self.api.articles().by_id(42)
+
+        self.assertIs(first, second)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+    def test_by_id_refetches_expired_object(self):
+
+        first = self.api.articles().by_id(42)
+        self.clock.now += 60
+        second = self.api.articles().by_id(42)
+
+        self.assertIsNot(first, second)
+        self.assertIs(self.api.articles().by_id(42), second)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
+
+    def test_collection_refetches_expired_object(self):
+
+        articles = self.api.articles()
+        first = articles.by_id(42)
+        self.clock.now += 60
+
+        self.assertIsNot(articles.by_id(42), first)
+        self.assertIsNot(articles.get_many([42])[0], first)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
+
+    def test_fetched_entries_refresh_mapped_object(self):
+
+        topic = self.api.topics()[0]
+        topic._entry['name'] = 'Stale'
+
+        self.assertIs(self.api.topics()[0], topic)
+        self.assertEqual(topic.name, 'Customer Support')
+
+    def test_refresh_keeps_unsaved_changes(self):
+
+        topic = self.api.topics()[0]
+        topic.name = 'Changed'
+
+        self.api.topics()[0]
+
+        self.assertEqual(topic.name, 'Changed')
+        self.assertEqual(topic._changed, {'name': 'Changed'})
+
+    def test_save_updates_live_object(self):
+
+        article = self.api.articles().by_id(1)
+        article.subject = 'New Subject'
+
+        saved = article.save()
+
+        self.assertIs(saved, article)
+        self.assertEqual(article.subject, 'New Subject')
+        self.assertEqual(article._changed, {})
+        self.assertEqual(
+            json.loads(httpretty.last_request().body.decode('utf8')),
+            {'subject': 'New Subject'},
+        )
+
+    def test_partial_entries_merge_into_mapped_object(self):
+
+        article = self.api.articles().by_id(1)
+        entry = {'subject': 'Fresh', '_links': article._links}
+
+        self.assertIs(self.api.object(entry, fields=['subject']), article)
+        self.assertFalse(article.partial)
+        self.assertEqual(article.subject, 'Fresh')
+        self.assertEqual(article.body, '<p>Body of 1</p>')
+
+    def test_sessions_without_identity_map_copy(self):
+
+        api = models.DeskApi2(sitename='testing')
+
+        self.assertIsNot(
+            api.articles().by_id(42),
+            api.articles().by_id(42),
+        )
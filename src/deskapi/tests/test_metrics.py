@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+from deskapi.six import TestCase
+
+import httpretty
+
+from deskapi import models
+from deskapi.metrics import (
+    RequestEvent,
+    RequestMetrics,
+    endpoint_template,
+)
+from deskapi.tests.util import fixture
+
+
+def event(method='GET', endpoint='/api/v2/articles', status=200,
+          elapsed=0.2, attempts=1):
+
+    return RequestEvent(
+        method=method,
+        url='https://testing.desk.com' + endpoint,
+        endpoint=endpoint,
+        status=status,
+        elapsed=elapsed,
+        request_bytes=0,
+        response_bytes=100,
+        attempts=attempts,
+        source=None,
+        page=None,
+    )
+
+
+class EndpointTemplateTests(TestCase):
+
+    def test_ids_and_locales_replaced(self):
+
+        self.assertEqual(
+            endpoint_template(
+                'https://testing.desk.com/api/v2/articles/42/translations/es'
+                '?fields=subject'
+            ),
+            '/api/v2/articles/{id}/translations/{locale}',
+        )
+        self.assertEqual(
+            endpoint_template('/api/v2/articles/42/translations'),
+            '/api/v2/articles/{id}/translations',
+        )
+
+
+class RequestMetricsTests(TestCase):
+
+    def setUp(self):
+
+        self.metrics = RequestMetrics(buckets=(0.1, 1.0))
+        self.metrics(event(elapsed=0.05))
+        self.metrics(event(elapsed=0.5, attempts=3))
+        self.metrics(event(status=404, elapsed=2))
+        self.metrics(event(method='PATCH', endpoint='/api/v2/articles/{id}'))
+
+    def test_as_dict(self):
+
+        articles = self.metrics.as_dict()['GET /api/v2/articles']
+
+        self.assertEqual(articles['requests'], 3)
+        self.assertEqual(articles['errors'], 1)
+        self.assertEqual(articles['retries'], 2)
+        self.assertEqual(articles['response_bytes'], 300)
+        self.assertEqual(articles['statuses'], {'200': 2, '404': 1})
+        self.assertEqual(
+            articles['latency']['buckets'],
+            {0.1: 1, 1.0: 2, '+Inf': 3},
+        )
+        self.assertAlmostEqual(articles['latency']['sum'], 2.55)
+        self.assertEqual(
+            sorted(self.metrics.as_dict()),
+            ['GET /api/v2/articles', 'PATCH /api/v2/articles/{id}'],
+        )
+
+    def test_prometheus(self):
+
+        lines = self.metrics.prometheus().splitlines()
+
+        self.assertTrue('# TYPE deskapi_requests_total counter' in lines)
+        self.assertTrue(
+            'deskapi_requests_total{method="GET",endpoint="/api/v2/articles",'
+            'status="404"} 1' in lines
+        )
+        self.assertTrue(
+            'deskapi_request_duration_seconds_bucket{method="GET",'
+            'endpoint="/api/v2/articles",le="1.0"} 2' in lines
+        )
+        self.assertTrue(
+            'deskapi_request_duration_seconds_count{method="GET",'
+            'endpoint="/api/v2/articles"} 3' in lines
+        )
+
+    def test_statsd(self):
+
+        lines = self.metrics.statsd(prefix='desk')
+
+        self.assertTrue('desk.get.api_v2_articles.requests:3|c' in lines)
+        self.assertTrue('desk.get.api_v2_articles.status.404:1|c' in lines)
+        self.assertTrue('desk.get.api_v2_articles.latency:850.000|ms' in lines)
+        self.assertTrue('desk.patch.api_v2_articles_id.requests:1|c' in lines)
+
+    def test_reset(self):
+
+        self.metrics.reset()
+
+        self.assertEqual(self.metrics.as_dict(), {})
+
+
+class SessionHookTests(TestCase):
+
+    def setUp(self):
+        httpretty.httpretty.reset()
+        httpretty.enable()
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            body=fixture('topic_list_page_1.json'),
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.PATCH,
+            'https://testing.desk.com/api/v2/topics/1',
+            body=fixture('topic_patch_topic_1.json'),
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics/99',
+            status=404,
+            body='{}',
+            content_type='application/json',
+        )
+
+        self.events = []
+        self.api = models.DeskApi2(sitename='testing', hooks=[self.events.append])
+
+    def tearDown(self):
+
+        httpretty.disable()
+
+    def test_page_requests_reported(self):
+
+        topics = self.api.topics()
+        topics.items()
+
+        self.assertEqual(len(self.events), 1)
+        page_event = self.events[0]
+        self.assertEqual(page_event.method, 'GET')
+        self.assertEqual(page_event.endpoint, '/api/v2/topics')
+        self.assertEqual(page_event.status, 200)
+        self.assertEqual(page_event.page, 1)
+        self.assertIs(page_event.source, topics)
+        self.assertEqual(page_event.attempts, 1)
+        self.assertEqual(page_event.retries, 0)
+        self.assertEqual(
+            page_event.response_bytes,
+            len(fixture('topic_list_page_1.json').encode('utf8')),
+        )
+
+    def test_writes_and_errors_reported(self):
+
+        topics = self.api.topics()
+        topics[0].update(name='Updated')
+        with self.assertRaises(models.DeskError):
+            topics.by_id(99)
+
+        update, error = self.events[1:]
+        self.assertEqual(update.method, 'PATCH')
+        self.assertEqual(update.endpoint, '/api/v2/topics/{id}')
+        self.assertEqual(
+            update.request_bytes,
+            len(self.api._codec.dumps({'name': 'Updated'})),
+        )
+        self.assertEqual(update.page, None)
+        self.assertEqual(error.status, 404)
+
+    def test_metrics_hook(self):
+
+        metrics = RequestMetrics()
+        api = models.DeskApi2(sitename='testing', hooks=[metrics])
+
+        api.topics().items()
+
+        self.assertEqual(metrics.as_dict()['GET /api/v2/topics']['requests'], 1)
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import re
+import shutil
+import tempfile
+
+from deskapi.six import TestCase
+
+import httpretty
+
+from deskapi import models
+from deskapi.mirror import DeskMirror
+from deskapi.tests.util import fixture
+
+
+class DeskMirrorTests(TestCase):
+
+    NUM_ARTICLES = 3
+
+    def _article_page(self, method, uri, headers):
+
+        template = fixture('article_template.json')
+        entries = []
+        for index in range(self.NUM_ARTICLES):
+            entry = json.loads(template % dict(index=index + 1))
+            entry['updated_at'] = self.updated_at.get(index + 1, entry['updated_at'])
+            entries.append(entry)
+
+        content = fixture('article_page_template.json') % dict(
+            entries=json.dumps(entries),
+            next='null',
+            previous='null',
+            num_entries=self.NUM_ARTICLES,
+        )
+        return (200, headers, content)
+
+    def _topic_translations(self, method, uri, headers):
+
+        topic_path = uri.split('desk.com', 1)[1].rsplit('/', 1)[0]
+
+        return (200, headers, fixture('topic_translations.json').replace(
+            '/api/v2/topics/1', topic_path,
+        ).encode('utf8'))
+
+    def _article_translations(self, method, uri, headers):
+
+        article_path = uri.split('desk.com', 1)[1].rsplit('/', 1)[0]
+
+        content = json.loads(fixture('article_translations.json').replace(
+            '/api/v2/articles/1', article_path,
+        ))
+        for entry in content['_embedded']['entries']:
+            entry.update(self.translation_updates.get(
+                '%s/%s' % (article_path, entry['locale']), {},
+            ))
+
+        return (200, headers, json.dumps(content).encode('utf8'))
+
+    def setUp(self):
+
+        self.updated_at = {}
+        self.translation_updates = {}
+        self.directory = tempfile.mkdtemp()
+
+        httpretty.httpretty.reset()
+        httpretty.enable()
+
+        # Give each topic its own translations.
+        topics = json.loads(fixture('topic_list_page_1.json'))
+        for topic in topics['_embedded']['entries']:
+            topic['_links']['translations']['href'] = (
+                topic['_links']['self']['href'] + '/translations'
+            )
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            body=json.dumps(topics),
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            re.compile(r'https://testing.desk.com/api/v2/topics/\d+/translations$'),
+            body=self._topic_translations,
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/articles',
+            body=self._article_page,
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            re.compile(r'https://testing.desk.com/api/v2/articles/\d+/translations$'),
+            body=self._article_translations,
+            content_type='application/json',
+        )
+
+        self.mirror = DeskMirror(
+            models.DeskApi2(sitename='testing'),
+            os.path.join(self.directory, 'mirror.db'),
+        )
+
+    def tearDown(self):
+
+        httpretty.disable()
+        self.mirror.close()
+        shutil.rmtree(self.directory)
+
+    def _translation_requests(self):
+
+        return [
+            request.path
+            for request in httpretty.httpretty.latest_requests
+            if request.path.endswith('/translations')
+        ]
+
+    def test_sync_mirrors_everything(self):
+
+        self.assertEqual(self.mirror.last_sync, None)
+
+        counts = self.mirror.sync()
+
+        # two topics and three articles, with two translations each
+        self.assertEqual(counts, {'updated': 15, 'deleted': 0})
+        self.assertTrue(self.mirror.last_sync)
+
+        httpretty.disable()
+
+        self.assertEqual(
+            [article.subject for article in self.mirror.articles()],
+            ['Subject 1', 'Subject 2', 'Subject 3'],
+        )
+        self.assertEqual(
+            [topic.name for topic in self.mirror.topics()],
+            ['Customer Support', 'Another Topic'],
+        )
+        self.assertEqual(
+            self.mirror.translations('/api/v2/articles/2')['es'].api_href,
+            '/api/v2/articles/2/translations/es',
+        )
+        self.assertIsInstance(
+            self.mirror.get('/api/v2/articles/3'),
+            models.DeskObject,
+        )
+
+    def test_sync_only_refetches_moved_records(self):
+
+        self.mirror.sync()
+        httpretty.httpretty.latest_requests = []
+
+        self.assertEqual(self.mirror.sync(), {'updated': 0, 'deleted': 0})
+        self.assertEqual(self._translation_requests(), [])
+
+        self.updated_at[2] = '2013-09-01T00:00:00Z'
+        self.assertEqual(self.mirror.sync(), {'updated': 1, 'deleted': 0})
+        self.assertEqual(
+            self._translation_requests(),
+            ['/api/v2/articles/2/translations'],
+        )
+
+    def test_full_sync_refetches_moved_translations(self):
+
+        self.mirror.sync()
+
+        self.translation_updates['/api/v2/articles/2/es'] = {
+            'subject': 'Tema Actualizado',
+            'updated_at': '2013-09-01T00:00:00Z',
+        }
+        self.assertEqual(self.mirror.sync(full=True),
+                         {'updated': 1, 'deleted': 0})
+
+        httpretty.disable()
+
+        self.assertEqual(
+            self.mirror.translations('/api/v2/articles/2')['es'].subject,
+            'Tema Actualizado',
+        )
+        self.assertEqual(
+            sorted(self.mirror.translations('/api/v2/articles/2')),
+            ['en', 'es'],
+        )
+
+    def test_sync_requests_only_updated_records(self):
+
+        self.mirror.sync()
+        httpretty.httpretty.latest_requests = []
+
+        self.updated_at[2] = '2013-09-01T00:00:00Z'
+        self.mirror.sync()
+        self.updated_at[3] = '2013-09-02T00:00:00Z'
+        self.mirror.sync()
+
+        # 2013-08-21T00:20:04Z, then 2013-09-01T00:00:00Z
+        self.assertEqual(
+            [
+                request.querystring.get('since_updated_at')
+                for request in httpretty.httpretty.latest_requests
+                if request.path.startswith('/api/v2/articles?')
+            ],
+            [['1377044404'], ['1377993600']],
+        )
+        self.assertEqual(
+            [article.subject for article in self.mirror.articles()],
+            ['Subject 1', 'Subject 2', 'Subject 3'],
+        )
+
+    def test_sync_removes_deleted_records(self):
+
+        self.mirror.sync()
+
+        self.NUM_ARTICLES = 2
+        self.assertEqual(self.mirror.sync(), {'updated': 0, 'deleted': 0})
+        counts = self.mirror.sync(full=True)
+
+        # the article and its two translations
+        self.assertEqual(counts, {'updated': 0, 'deleted': 3})
+        self.assertEqual(self.mirror.get('/api/v2/articles/3'), None)
+        self.assertEqual(self.mirror.translations('/api/v2/articles/3'), {})
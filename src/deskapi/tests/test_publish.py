@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import re
+import shutil
+import tempfile
+
+from deskapi.six import (
+    TestCase,
+    unicode_str,
+)
+
+import httpretty
+
+from deskapi import models
+from deskapi.publish import (
+    DeskPublisher,
+    content_hash,
+)
+
+
+def _article(id, fields):
+
+    return dict(fields, _links={
+        'self': {'href': '/api/v2/articles/%s' % (id,), 'class': 'article'},
+        'translations': {
+            'href': '/api/v2/articles/%s/translations' % (id,),
+            'class': 'article_translation',
+        },
+    })
+
+
+def _translation(id, locale, fields):
+
+    return dict(fields, locale=locale, _links={
+        'self': {
+            'href': '/api/v2/articles/%s/translations/%s' % (id, locale),
+            'class': 'article_translation',
+        },
+    })
+
+
+def _page(entries):
+
+    return json.dumps({
+        'total_entries': len(entries),
+        '_links': {'next': None},
+        '_embedded': {'entries': entries},
+    })
+
+
+class DeskPublisherTests(TestCase):
+
+    def _articles(self, request, uri, headers):
+
+        return (200, headers, _page([
+            _article(id, fields) for id, fields in sorted(self.articles.items())
+        ]))
+
+    def _show_article(self, request, uri, headers):
+
+        id = int(re.search(r'/articles/(\d+)', uri).group(1))
+
+        return (200, headers, json.dumps(_article(id, self.articles[id])))
+
+    def _translations(self, request, uri, headers):
+
+        id = int(re.search(r'/articles/(\d+)/', uri).group(1))
+
+        return (200, headers, _page([
+            _translation(id, locale, fields)
+            for locale, fields in sorted(self.translations.get(id, {}).items())
+        ]))
+
+    def _batch(self, request, uri, headers):
+
+        operations = json.loads(unicode_str(request.body))['requests']
+        self.operations.extend(
+            operations[key] for key in sorted(operations, key=int)
+        )
+
+        responses = {}
+        for key, operation in operations.items():
+            href = operation['url']
+            if operation['method'] == 'POST' and 'locale' in operation['body']:
+                href = '%s/%s' % (href, operation['body']['locale'])
+            elif operation['method'] == 'POST':
+                href = '%s/%s' % (href, 100 + int(key))
+
+            body = dict(operation['body'])
+            body['_links'] = {'self': {'href': href}}
+            responses[key] = {'status': 200, 'body': body}
+
+        return (200, headers, json.dumps({'responses': responses}))
+
+    def setUp(self):
+        httpretty.httpretty.reset()
+        httpretty.enable()
+
+        self.articles = {
+            1: {'subject': 'One', 'body': 'First'},
+            2: {'subject': 'Two', 'body': 'Second'},
+        }
+        self.translations = {
+            1: {'es': {'subject': 'Uno', 'body': 'Primero'}},
+        }
+        self.operations = []
+
+        httpretty.register_uri(
+            httpretty.GET,
+            re.compile(r'https://testing.desk.com/api/v2/articles(\?.*)?$'),
+            body=self._articles,
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            re.compile(r'https://testing.desk.com/api/v2/articles/\d+(\?.*)?$'),
+            body=self._show_article,
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            re.compile(
+                r'https://testing.desk.com/api/v2/articles/\d+/translations'
+                r'(\?.*)?$'
+            ),
+            body=self._translations,
+            content_type='application/json',
+        )
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://testing.desk.com/api/v2/batch',
+            body=self._batch,
+            content_type='application/json',
+        )
+
+        self.api = models.DeskApi2(sitename='testing')
+        self.directory = tempfile.mkdtemp()
+        self.manifest = os.path.join(self.directory, 'manifest.json')
+
+    def tearDown(self):
+
+        httpretty.disable()
+        shutil.rmtree(self.directory)
+
+    def records(self):
+
+        return [
+            {
+                'id': 1,
+                'subject': 'One',
+                'body': 'First',
+                'translations': {
+                    'es': {'subject': 'Uno', 'body': 'Primero'},
+                    'fr': {'subject': 'Un', 'body': 'Premier'},
+                },
+            },
+            {'id': 2, 'subject': 'Two (revised)', 'body': 'Second'},
+            {'subject': 'Three', 'body': 'Third'},
+        ]
+
+    def requests(self):
+
+        return set(
+            (request.method, request.path)
+            for request in httpretty.httpretty.latest_requests
+        )
+
+    def test_content_hash_is_stable(self):
+
+        self.assertEqual(
+            content_hash({'subject': 'One', 'body': 'First'}),
+            content_hash({'body': 'First', 'subject': 'One'}),
+        )
+        self.assertNotEqual(
+            content_hash({'subject': 'One'}),
+            content_hash({'subject': 'One '}),
+        )
+
+    def test_only_differences_sent(self):
+
+        result = DeskPublisher(self.api).publish(self.records())
+
+        self.assertEqual(self.operations, [
+            {
+                'method': 'PATCH',
+                'url': '/api/v2/articles/2',
+                'body': {'subject': 'Two (revised)'},
+            },
+            {
+                'method': 'POST',
+                'url': '/api/v2/articles',
+                'body': {'subject': 'Three', 'body': 'Third'},
+            },
+            {
+                'method': 'POST',
+                'url': '/api/v2/articles/1/translations',
+                'body': {'locale': 'fr', 'subject': 'Un', 'body': 'Premier'},
+            },
+        ])
+        self.assertEqual(result['articles'], {
+            'created': 1, 'updated': 1, 'unchanged': 1, 'failed': 0,
+        })
+        self.assertEqual(result['translations'], {
+            'created': 1, 'updated': 0, 'unchanged': 1, 'failed': 0,
+        })
+        self.assertEqual(result['errors'], [])
+
+    def test_manifest_skips_unchanged_records(self):
+
+        DeskPublisher(self.api, manifest=self.manifest).publish(self.records())
+        httpretty.httpretty.latest_requests = []
+        self.operations = []
+
+        records = self.records()
+        records[0]['body'] = 'First (revised)'
+        del records[2]
+        result = DeskPublisher(self.api, manifest=self.manifest).publish(
+            records,
+        )
+
+        self.assertEqual(self.operations, [{
+            'method': 'PATCH',
+            'url': '/api/v2/articles/1',
+            'body': {'body': 'First (revised)'},
+        }])
+        self.assertEqual(self.requests(), set([
+            ('GET', '/api/v2/articles/1?fields=body%2Csubject'),
+            ('POST', '/api/v2/batch'),
+        ]))
+        self.assertEqual(result['articles']['unchanged'], 1)
+        self.assertEqual(result['translations']['unchanged'], 2)
+
+        with open(self.manifest) as manifest_file:
+            manifest = json.load(manifest_file)
+        self.assertEqual(
+            manifest['articles']['1'],
+            content_hash({'subject': 'One', 'body': 'First (revised)'}),
+        )
+        self.assertEqual(sorted(manifest['translations']), ['1/es', '1/fr'])
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+from deskapi.six import TestCase
+
+import httpretty
+
+from deskapi import models
+from deskapi.ratelimit import RateLimiter
+from deskapi.tests.util import fixture
+
+
+class FakeClock(object):
+
+    def __init__(self):
+
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+
+        return self.now
+
+    def sleep(self, seconds):
+
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimiterTests(TestCase):
+
+    def setUp(self):
+
+        self.clock = FakeClock()
+
+    def limiter(self, **kwargs):
+
+        return RateLimiter(clock=self.clock.time, sleep=self.clock.sleep, **kwargs)
+
+    def test_burst_up_to_limit_then_waits(self):
+
+        limiter = self.limiter(limit=3, period=3.0)
+
+        for i in range(4):
+            limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps, [1.0])
+
+    def test_remaining_header_reduces_budget(self):
+
+        limiter = self.limiter(limit=60)
+        limiter.update({
+            'X-Rate-Limit-Limit': '60',
+            'X-Rate-Limit-Remaining': '0',
+            'X-Rate-Limit-Reset': '12',
+        })
+
+        limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps, [12])
+
+    def test_limit_header_resizes_bucket(self):
+
+        limiter = self.limiter(limit=60)
+        limiter.update({'X-Rate-Limit-Limit': '120'})
+
+        self.assertEqual(limiter.limit, 120)
+
+    def test_pause_holds_requests(self):
+
+        limiter = self.limiter()
+        limiter.pause(5)
+        limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps[0], 5)
+
+    def test_retry_after(self):
+
+        limiter = self.limiter()
+
+        self.assertEqual(limiter.retry_after({'Retry-After': '7'}), 7)
+        self.assertEqual(limiter.retry_after({'X-Rate-Limit-Reset': '3'}), 3)
+        self.assertEqual(limiter.retry_after({}), 1)
+
+
+class RateLimitedSessionTests(TestCase):
+
+    def setUp(self):
+
+        self.clock = FakeClock()
+
+        httpretty.httpretty.reset()
+        httpretty.enable()
+
+    def tearDown(self):
+
+        httpretty.disable()
+
+    def test_429_paused_and_retried(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            responses=[
+                httpretty.Response(body='{}', status=429,
+                                   adding_headers={'Retry-After': '2'}),
+                httpretty.Response(body=fixture('topic_list_page_1.json')),
+            ],
+            content_type='application/json',
+        )
+
+        desk_api = models.DeskApi2(
+            sitename='testing',
+            rate_limiter=RateLimiter(clock=self.clock.time,
+                                     sleep=self.clock.sleep),
+        )
+
+        self.assertEqual(len(desk_api.topics()), 2)
+        self.assertEqual(self.clock.sleeps, [2])
+
+    def test_429_raised_after_max_retries(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            body='{}',
+            status=429,
+            content_type='application/json',
+        )
+
+        desk_api = models.DeskApi2(
+            sitename='testing',
+            rate_limiter=RateLimiter(max_retries=2, clock=self.clock.time,
+                                     sleep=self.clock.sleep),
+        )
+
+        with self.assertRaises(models.DeskError):
+            desk_api.topics().items()
+        self.assertEqual(len(self.clock.sleeps), 2)
+
+    def test_limiter_shared_with_children(self):
+
+        limiter = RateLimiter()
+        desk_api = models.DeskApi2(sitename='testing', rate_limiter=limiter)
+
+        self.assertIs(desk_api.topics()._rate_limiter, limiter)
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+from deskapi.six import TestCase
+
+import httpretty
+import requests
+
+from deskapi import models
+from deskapi.ratelimit import RateLimiter
+from deskapi.retry import (
+    CircuitBreaker,
+    RetryPolicy,
+)
+from deskapi.tests.util import fixture
+
+
+class RetryPolicyTests(TestCase):
+
+    def test_delay_grows_exponentially_with_cap(self):
+
+        policy = RetryPolicy(backoff=1, max_backoff=5, jitter=False)
+
+        self.assertEqual(
+            [policy.delay(failures) for failures in range(1, 5)],
+            [1, 2, 4, 5],
+        )
+
+    def test_delay_jitter(self):
+
+        policy = RetryPolicy(backoff=1, random=lambda: 0.5)
+
+        self.assertEqual(policy.delay(3), 2)
+
+    def test_only_configured_methods_retried(self):
+
+        self.assertTrue(RetryPolicy().should_retry('get', 1))
+        self.assertFalse(RetryPolicy().should_retry('PATCH', 1))
+        self.assertTrue(
+            RetryPolicy(methods=('GET', 'PATCH')).should_retry('PATCH', 1)
+        )
+        self.assertFalse(RetryPolicy(max_retries=2).should_retry('GET', 3))
+
+
+class CircuitBreakerTests(TestCase):
+
+    def setUp(self):
+
+        self.now = 0
+        self.breaker = CircuitBreaker(
+            failure_threshold=2,
+            reset_timeout=10,
+            clock=lambda: self.now,
+        )
+
+    def test_opens_after_consecutive_failures(self):
+
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_allows_one_trial(self):
+
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.now = 10
+
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        self.now = 20
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_release_ends_trial(self):
+
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.now = 10
+
+        self.assertTrue(self.breaker.allow())
+        self.breaker.release()
+        self.assertTrue(self.breaker.allow())
+
+
+class RetryingSessionTests(TestCase):
+
+    def setUp(self):
+
+        self.sleeps = []
+
+        httpretty.httpretty.reset()
+        httpretty.enable()
+
+    def tearDown(self):
+
+        httpretty.disable()
+
+    def desk_api(self, **kwargs):
+
+        kwargs.setdefault('retry', RetryPolicy(
+            max_retries=2,
+            jitter=False,
+            sleep=self.sleeps.append,
+        ))
+
+        return models.DeskApi2(sitename='testing', **kwargs)
+
+    def fail_requests(self, desk_api, error, count=None):
+        """Make desk_api's next count requests raise error, or all of them.
+
+        The error is raised on the client side, before httpretty's server
+        sees the request.
+        """
+
+        session = desk_api._session
+        request = session.request
+        calls = []
+
+        def fail(*args, **kwargs):
+            calls.append(args)
+            if count is not None and len(calls) > count:
+                return request(*args, **kwargs)
+            raise error
+
+        session.request = fail
+
+    def test_server_error_retried(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            responses=[
+                httpretty.Response(body='{}', status=503),
+                httpretty.Response(body=fixture('topic_list_page_1.json')),
+            ],
+            content_type='application/json',
+        )
+
+        self.assertEqual(len(self.desk_api().topics()), 2)
+        self.assertEqual(self.sleeps, [0.5])
+
+    def test_connection_error_retried(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            body=fixture('topic_list_page_1.json'),
+            content_type='application/json',
+        )
+        desk_api = self.desk_api()
+        self.fail_requests(
+            desk_api, requests.ConnectionError('connection reset'), count=1,
+        )
+
+        self.assertEqual(len(desk_api.topics()), 2)
+        self.assertEqual(len(self.sleeps), 1)
+
+    def test_error_reports_attempts_and_response(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            body='{}',
+            status=500,
+            content_type='application/json',
+        )
+
+        with self.assertRaises(models.DeskError) as raised:
+            self.desk_api().topics().items()
+
+        error = raised.exception
+        self.assertEqual(error.status, '500')
+        self.assertEqual(error.attempts, 3)
+        self.assertEqual(error.response.status_code, 500)
+        self.assertTrue(error.elapsed >= 0)
+        self.assertEqual(self.sleeps, [0.5, 1.0])
+
+    def test_patch_not_retried_by_default(self):
+
+        httpretty.register_uri(
+            httpretty.PATCH,
+            'https://testing.desk.com/api/v2/topics/1',
+            body='{}',
+            status=500,
+            content_type='application/json',
+        )
+
+        with self.assertRaises(models.DeskError) as raised:
+            self.desk_api().request('topics/1', method='PATCH', data='{}')
+
+        self.assertEqual(raised.exception.attempts, 1)
+
+    def test_open_circuit_fails_fast(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            body='{}',
+            status=500,
+            content_type='application/json',
+        )
+        desk_api = self.desk_api(
+            circuit_breaker=CircuitBreaker(failure_threshold=2),
+        )
+
+        with self.assertRaises(models.DeskError):
+            desk_api.topics().items()
+        with self.assertRaises(models.DeskError) as raised:
+            desk_api.topics().items()
+
+        self.assertEqual(raised.exception.status, 'circuit open')
+        self.assertEqual(raised.exception.attempts, 0)
+
+    def test_rate_limited_trial_settles_circuit(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            responses=[
+                httpretty.Response(body='{}', status=500),
+                httpretty.Response(body='{}', status=429,
+                                   adding_headers={'Retry-After': '1'}),
+                httpretty.Response(body=fixture('topic_list_page_1.json')),
+            ],
+            content_type='application/json',
+        )
+        now = [0]
+        breaker = CircuitBreaker(
+            failure_threshold=1,
+            reset_timeout=10,
+            clock=lambda: now[0],
+        )
+        desk_api = self.desk_api(
+            retry=None,
+            circuit_breaker=breaker,
+            rate_limiter=RateLimiter(
+                clock=lambda: sum(self.sleeps),
+                sleep=self.sleeps.append,
+            ),
+        )
+
+        with self.assertRaises(models.DeskError):
+            desk_api.topics().items()
+
+        now[0] = 10
+        self.assertEqual(len(desk_api.topics()), 2)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(len(desk_api.topics()), 2)
+        # the Retry-After pause, then the wait for a token to refill
+        self.assertEqual(self.sleeps, [1, 1.0])
+
+    def test_unexpected_error_releases_trial(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://testing.desk.com/api/v2/topics',
+            body=fixture('topic_list_page_1.json'),
+            content_type='application/json',
+        )
+        now = [0]
+        breaker = CircuitBreaker(
+            failure_threshold=1,
+            reset_timeout=10,
+            clock=lambda: now[0],
+        )
+        breaker.record_failure()
+        now[0] = 10
+        desk_api = self.desk_api(circuit_breaker=breaker)
+        self.fail_requests(
+            desk_api, requests.TooManyRedirects('redirected'), count=1,
+        )
+
+        with self.assertRaises(requests.TooManyRedirects):
+            desk_api.topics().items()
+
+        self.assertEqual(len(desk_api.topics()), 2)
+
+    def test_connection_error_raised_as_desk_error(self):
+
+        desk_api = self.desk_api()
+        self.fail_requests(
+            desk_api, requests.ConnectionError('connection reset'),
+        )
+
+        with self.assertRaises(models.DeskError) as raised:
+            desk_api.topics().items()
+
+        error = raised.exception
+        self.assertEqual(error.status, 'connection error')
+        self.assertEqual(error.attempts, 3)
+        self.assertTrue(error.elapsed >= 0)
+        self.assertIsInstance(error.__cause__, requests.ConnectionError)
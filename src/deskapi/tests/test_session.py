@@ -54,3 +54,85 @@ class DeskSessionTests(TestCase):
             '_links': {},
         })
         self.assertEqual(session._sitename, collection._sitename)
+
+    def test_session_shared_with_collection(self):
+
+        session = models.DeskSession(sitename='example')
+
+        collection = session.collection({
+            'class': 'Testing',
+            'href': '/api/v2/blarf',
+        })
+
+        self.assertIs(session._session, collection._session)
+
+    def test_session_shared_with_object(self):
+
+        session = models.DeskSession(sitename='example')
+
+        obj = session.object({
+            '_links': {},
+        })
+
+        self.assertIs(session._session, obj._session)
+
+    def test_existing_session_used(self):
+
+        requests_session = requests.Session()
+        session = models.DeskSession(
+            sitename='example',
+            session=requests_session,
+        )
+
+        self.assertIs(session._session, requests_session)
+
+    def test_pool_size_configures_site_adapter(self):
+
+        session = models.DeskSession(sitename='example', pool_size=25)
+
+        adapter = session._session.get_adapter('https://example.desk.com/api/v2')
+        self.assertEqual(adapter._pool_maxsize, 25)
+
+    def test_objects_share_context(self):
+
+        session = models.DeskSession(sitename='example')
+
+        obj = session.object({
+            '_links': {},
+        })
+
+        self.assertIs(obj._context, session._context)
+        self.assertFalse(hasattr(obj, '__dict__'))
+
+    def test_object_tracks_assignments(self):
+
+        session = models.DeskSession(sitename='example')
+        obj = session.object({
+            'subject': 'Subject',
+            '_links': {},
+        })
+
+        self.assertEqual(obj._changed, {})
+
+        obj.subject = 'New Subject'
+
+        self.assertEqual(obj.subject, 'New Subject')
+        self.assertEqual(obj._changed, {'subject': 'New Subject'})
+
+    def test_object_missing_special_attribute(self):
+
+        obj = models.DeskSession(sitename='example').object({'_links': {}})
+
+        self.assertFalse(hasattr(obj, '__length_hint__'))
+
+    def test_base_url_overrides_site_url(self):
+
+        session = models.DeskSession(
+            sitename='example',
+            base_url='http://127.0.0.1:8000',
+        )
+
+        self.assertEqual(
+            session._url('articles'),
+            'http://127.0.0.1:8000/api/v2/articles',
+        )